@@ -0,0 +1,1445 @@
+import hashlib
+import io
+import json
+import mmap
+import os
+import pickle
+import re
+import shutil
+import tempfile
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+
+# Patterns of the SVG reader. It only looks for the few tags and attributes it needs and is not an XML parser.
+_SVG_TAG = re.compile(rb"<svg\b")
+_VIEW_BOX = re.compile(rb'viewBox="(\d+) (\d+) (\d+) (\d+)"')
+_PATH_TAG = re.compile(rb"<path\b([^>]*)>")
+_PATH_ID = re.compile(rb'\bid="([^"]*)"')
+_PATH_D = re.compile(rb'\bd="([^"]*)"')
+_PATH_TOKEN = re.compile(rb"(?<!\S)(\d+\.?\d*),(\d+\.?\d*)|(Z)")
+# "d" attributes only made of commands and "x,y" coordinates separated by spaces, whose numbers are read at once
+_PATH_PLAIN = re.compile(rb"\s*(?:(?:[A-Za-z]|\d+\.?\d*,\d+\.?\d*)(?:\s+|$))*")
+_PATH_COMMANDS = bytes(c for c in range(256) if chr(c).isalpha() and chr(c) != "Z")
+
+
+def read_svg(path_file):
+    """
+    Reads the paths of a SVG file in a single pass over its memory-mapped content.
+    Each path is a list of rings closed by a "Z", made of the absolute "x,y" coordinates following its "d" attribute.
+    Repeated consecutive coordinates are skipped, as well as the rings of less than three vertices.
+    :param path_file: Absolute or relative filepath to the SVG file.
+    :return: Tuple (view_box, ids, vertices, ring_offsets, path_offsets). The vertices of the ring r are
+    vertices[ring_offsets[r]:ring_offsets[r + 1]] and the rings of the path p are the ones from path_offsets[p] to
+    path_offsets[p + 1]. The vertices are in the view box coordinate system. view_box is None if none was found.
+    """
+    with open(path_file, "rb") as f:
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # Empty file
+            data = b""
+        try:
+            return _read_svg_content(data)
+        finally:
+            if isinstance(data, mmap.mmap):
+                data.close()
+
+
+def read_view_box(path_file):
+    """
+    Reads only the view box of a SVG file, without going through its paths.
+    :param path_file: Absolute or relative filepath to the SVG file.
+    :return: The view box as a tuple (x_start, y_start, x_end, y_end), or None if none was found.
+    """
+    with open(path_file, "rb") as f:
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # Empty file
+            return None
+        try:
+            svg_tag = _SVG_TAG.search(data)
+            view_box = _VIEW_BOX.search(data, svg_tag.end()) if svg_tag else None
+            return tuple(map(int, view_box.groups())) if view_box else None
+        finally:
+            data.close()
+
+
+def check_view_box(view_box, expected):
+    """
+    Checks that the view box of a file corresponds to the one of the files read before.
+    :param view_box: View box of the file, or None if it has none.
+    :param expected: View box of the files read before, or None if there is none yet.
+    :return: The view box shared by all the files.
+    """
+    if expected is None:
+        return view_box
+    if view_box is not None and view_box != expected:
+        raise Exception("View Boxes of all path files don't correspond. Found %s ; expected %s"
+                        % (view_box, expected))
+    return expected
+
+
+def _read_svg_content(data):
+    ids = []
+    # The paths are converted one by one into a buffer of floats, so that no Python object per coordinate outlives its
+    # path. Every coordinate holds a comma, so the buffer is sized by them, and only the pages written take memory
+    vertices = np.empty((sum(data[start:start + (1 << 24)].count(b",") for start in range(0, len(data), 1 << 24)), 2))
+    n_vertices = 0
+    ring_sizes = []
+    ring_counts = []
+    svg_tag = _SVG_TAG.search(data)
+    view_box = _VIEW_BOX.search(data, svg_tag.end()) if svg_tag else None
+    for path_tag in _PATH_TAG.finditer(data, view_box.end()) if view_box else ():
+        path_id = _PATH_ID.search(path_tag.group(1))
+        path_d = _PATH_D.search(path_tag.group(1))
+        if path_id is not None and path_d is not None:
+            points, sizes = _read_path(path_d.group(1))
+            vertices[n_vertices:n_vertices + len(points)] = points
+            n_vertices += len(points)
+            ids.append(path_id.group(1).decode())
+            ring_sizes.extend(sizes.tolist())
+            ring_counts.append(len(sizes))
+    vertices.resize((n_vertices, 2), refcheck=False)
+    return tuple(map(int, view_box.groups())) if view_box else None, ids, vertices, \
+        np.concatenate(([0], np.cumsum(ring_sizes, dtype=np.int64))), \
+        np.concatenate(([0], np.cumsum(ring_counts, dtype=np.int64)))
+
+
+def _read_path(d):
+    # Vertices and ring sizes of the "d" attribute of a path
+    if _PATH_PLAIN.fullmatch(d):
+        # Each "Z" becomes a pair of nan among the coordinates
+        tokens = np.array(d.translate(None, _PATH_COMMANDS).replace(b",", b" ").replace(b"Z", b" nan nan ").split(),
+                          dtype=np.float64).reshape(-1, 2)
+        closing = np.isnan(tokens[:, 0])
+        points = tokens[~closing]
+    else:
+        tokens = _PATH_TOKEN.findall(d)
+        tokens = np.array(tokens) if tokens else np.empty((0, 3), dtype="S1")
+        closing = tokens[:, 2] == b"Z"
+        points = tokens[~closing, :2].astype(np.float64)
+    rings = (np.cumsum(closing) - closing)[~closing]
+    # Dropping the coordinates after the last "Z" and the ones repeating the previous coordinate
+    keep = rings < np.count_nonzero(closing)
+    keep[1:] &= (points[1:] != points[:-1]).any(axis=1) | (rings[1:] != rings[:-1])
+    sizes = np.bincount(rings[keep], minlength=np.count_nonzero(closing))
+    keep[keep] = sizes[rings[keep]] >= 3
+    return points[keep], sizes[sizes >= 3]
+
+
+def ring_boxes(vertices, ring_offsets):
+    """
+    Returns the bounding box of each ring of a flat geometry.
+    :param vertices: Array of shape (n, 2) of the vertices of all the rings.
+    :param ring_offsets: Array of the offsets of the rings in vertices, ending with the number of vertices.
+    :return: Array of shape (number of rings, 4) of the bounding boxes. Form : (x_start, y_start, x_end, y_end)
+    """
+    if len(ring_offsets) < 2:
+        return np.empty((0, 4))
+    return np.hstack((np.minimum.reduceat(vertices, ring_offsets[:-1]),
+                      np.maximum.reduceat(vertices, ring_offsets[:-1])))
+
+
+def ring_segments(vertices, ring_offsets, closed=True):
+    """
+    Returns the sides of each ring of a flat geometry, ordered by ring.
+    :param vertices: Array of shape (n, 2) of the vertices of all the rings.
+    :param ring_offsets: Array of the offsets of the rings in vertices, ending with the number of vertices.
+    :param closed: If True, the side going from the last vertex of each ring back to its first one is included.
+    :return: Tuple (starts, ends, rings) of the apexes of the segments and of the index of their ring.
+    """
+    ring_offsets = np.asarray(ring_offsets)
+    rings = np.repeat(np.arange(len(ring_offsets) - 1), np.diff(ring_offsets))
+    inner = np.flatnonzero(rings[:-1] == rings[1:])
+    starts, ends, segment_rings = vertices[inner], vertices[inner + 1], rings[inner]
+    if closed and len(ring_offsets) > 1:
+        order = np.argsort(np.concatenate((segment_rings, np.arange(len(ring_offsets) - 1))), kind="stable")
+        starts = np.concatenate((starts, vertices[ring_offsets[1:] - 1]))[order]
+        ends = np.concatenate((ends, vertices[ring_offsets[:-1]]))[order]
+        segment_rings = np.concatenate((segment_rings, np.arange(len(ring_offsets) - 1)))[order]
+    return starts, ends, segment_rings
+
+
+def geometry_metrics(vertices, ring_offsets, path_offsets):
+    """
+    Computes the area, centroid, bounding box and perimeter of every ring and every path of a flat geometry at once.
+    The area and centroid of the rings come from the shoelace formula. A path adds up the areas and perimeters of its
+    rings, its centroid is the mean of their centroids weighted by their areas, and its box surrounds all of them.
+    :param vertices: Array of shape (n, 2) of the vertices of all the rings.
+    :param ring_offsets: Array of the offsets of the rings in vertices, ending with the number of vertices.
+    :param path_offsets: Array of the offsets of the paths in the rings, ending with the number of rings.
+    :return: Tuple (ring_metrics, path_metrics) of dictionaries of arrays : "area" and "perimeter" of shape (n,),
+    "centroid" of shape (n, 2) and "bbox" of shape (n, 4). Form of the boxes : (x_start, y_start, x_end, y_end)
+    """
+    def sums(groups, values, n):
+        return np.bincount(groups, values, minlength=n).astype(np.float64)
+
+    ring_offsets, path_offsets = np.asarray(ring_offsets), np.asarray(path_offsets)
+    n_rings, n_paths = len(ring_offsets) - 1, len(path_offsets) - 1
+    ring_sizes = np.diff(ring_offsets)
+    rings = np.repeat(np.arange(n_rings), ring_sizes)
+    # Coordinates relative to the first vertex of their ring, for the precision of the cross products
+    local = vertices - vertices[ring_offsets[:-1]][rings] if n_rings else np.empty((0, 2))
+    following = np.arange(1, len(vertices) + 1)
+    following[ring_offsets[1:] - 1] = ring_offsets[:-1]
+    local_next = local[following]
+    cross = local[:, 0] * local_next[:, 1] - local_next[:, 0] * local[:, 1]
+    sides = np.hypot(*(local_next - local).T)
+    areas = sums(rings, cross, n_rings) / 2
+    moments = np.column_stack([sums(rings, (local[:, i] + local_next[:, i]) * cross, n_rings)
+                               for i in range(2)])
+    means = np.column_stack([sums(rings, local[:, i], n_rings) for i in range(2)]) / \
+        np.maximum(ring_sizes, 1)[:, None]
+    # The rings without area fall back on the mean of their vertices
+    centroids = np.divide(moments, 6 * areas[:, None], out=means, where=areas[:, None] != 0)
+    if n_rings:
+        centroids += vertices[ring_offsets[:-1]]
+    ring_metrics = {"area": np.abs(areas), "centroid": centroids, "bbox": ring_boxes(vertices, ring_offsets),
+                    "perimeter": sums(rings, sides, n_rings)}
+
+    paths = np.repeat(np.arange(n_paths), np.diff(path_offsets))
+    path_areas = sums(paths, ring_metrics["area"], n_paths)
+    # The paths whose rings have no area fall back on the mean of the centroids of their rings
+    weights = np.where(path_areas[paths] > 0, ring_metrics["area"], 1.)
+    # The paths without rings have no centroid nor box
+    filled = np.diff(path_offsets) > 0
+    path_centroids = np.divide(np.column_stack([sums(paths, weights * ring_metrics["centroid"][:, i], n_paths)
+                                                for i in range(2)]), sums(paths, weights, n_paths)[:, None],
+                               out=np.full((n_paths, 2), np.nan), where=filled[:, None])
+    path_boxes = np.full((n_paths, 4), np.nan)
+    if filled.any():
+        starts = path_offsets[:-1][filled]
+        path_boxes[filled] = np.hstack((np.minimum.reduceat(ring_metrics["bbox"][:, :2], starts),
+                                        np.maximum.reduceat(ring_metrics["bbox"][:, 2:], starts)))
+    path_metrics = {"area": path_areas, "centroid": path_centroids, "bbox": path_boxes,
+                    "perimeter": sums(paths, ring_metrics["perimeter"], n_paths)}
+    return ring_metrics, path_metrics
+
+
+# Version of the layout of the geometry cache, to be increased whenever it changes
+CACHE_VERSION = 1
+
+
+def cache_key(path_file, **parameters):
+    """
+    Returns the key of a SVG file in the geometry cache, from a hash of its content and of the reading parameters.
+    :param path_file: Absolute or relative filepath to the SVG file.
+    :param parameters: Any parameter changing the geometry read from the file (box, invert_y, backend...).
+    :return: Hexadecimal key.
+    """
+    digest = hashlib.sha256()
+    with open(path_file, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    digest.update(json.dumps(dict(parameters, version=CACHE_VERSION), sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+def load_cache(cache_dir, key):
+    """
+    Loads an entry of the geometry cache. The arrays are memory-mapped, not copied.
+    :param cache_dir: Folder of the cache.
+    :param key: Key returned by cache_key.
+    :return: Tuple (meta, arrays) of the dictionaries given to save_cache, or None if the entry doesn't exist.
+    """
+    folder = os.path.join(cache_dir, key)
+    try:
+        with open(os.path.join(folder, "meta.json"), "r") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    # Empty arrays cannot be memory-mapped
+    return meta, {name: np.load(os.path.join(folder, name + ".npy"), mmap_mode="r" if size else None)
+                  for name, size in meta["arrays"].items()}
+
+
+def save_cache(cache_dir, key, meta, arrays):
+    """
+    Saves an entry of the geometry cache, as a folder of raw .npy files and a meta.json file.
+    The entry is written aside and renamed once complete, so that concurrent processes never read a partial one.
+    :param cache_dir: Folder of the cache.
+    :param key: Key returned by cache_key.
+    :param meta: Dictionary of JSON serializable values.
+    :param arrays: Dictionary of numpy arrays, by name.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    folder = tempfile.mkdtemp(prefix=key + ".", dir=cache_dir)
+    for name, array in arrays.items():
+        np.save(os.path.join(folder, name + ".npy"), np.ascontiguousarray(array))
+    with open(os.path.join(folder, "meta.json"), "w") as f:
+        json.dump(dict(meta, arrays={name: int(np.size(array)) for name, array in arrays.items()}), f)
+    try:
+        os.rename(folder, os.path.join(cache_dir, key))
+    except OSError:  # Already saved by another process
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+def chunk_columns(chunk, x_column="x", y_column="y", weight_column=None):
+    """
+    Extracts the x and y coordinates of a chunk of points.
+    :param chunk: Tuple (x, y) of array-likes, array of shape (n, 2), DataFrame, dictionary of arrays or Arrow record
+    batch or table. With weights, the tuples are (x, y, weights) and the arrays of shape (n, 3).
+    :param x_column: Name of the x column, for the chunks with named columns.
+    :param y_column: Name of the y column, for the chunks with named columns.
+    :param weight_column: If given, name of a column of weights extracted as well.
+    :return: Tuple of arrays (x, y), or (x, y, weights) if weight_column is given.
+    """
+    columns = (x_column, y_column) if weight_column is None else (x_column, y_column, weight_column)
+    if isinstance(chunk, (tuple, list)):
+        return tuple(chunk[:len(columns)])
+    if isinstance(chunk, np.ndarray) and chunk.dtype.names is None:
+        return tuple(chunk[:, i] for i in range(len(columns)))
+    if hasattr(chunk, "schema"):  # Arrow record batch or table
+        return tuple(chunk.column(column).to_numpy() for column in columns)
+    return tuple(chunk[column] for column in columns)
+
+
+def accumulate_labels(labels, counts, sums=None, weights=None):
+    """
+    Adds the number of points of each label, and the sum of their weights, to running totals.
+    The points without label (-1) are left out.
+    :param labels: Integer array of the label of each point.
+    :param counts: int64 array of the number of points of each label, updated in place.
+    :param sums: float64 array of the sum of the weights of each label, updated in place if given.
+    :param weights: Array-like of the weight of each point, required with sums.
+    """
+    assigned = labels >= 0
+    counts += np.bincount(labels[assigned], minlength=len(counts))
+    if sums is not None:
+        sums += np.bincount(labels[assigned], weights=np.asarray(weights, dtype=np.float64)[assigned],
+                            minlength=len(sums))
+
+
+def unique_points(x, y):
+    """
+    Returns the distinct points of arrays of coordinates.
+    :param x: Array of x coordinates.
+    :param y: Array of y coordinates.
+    :return: Tuple (x, y, inverse) of the coordinates of the distinct points, and of the index of each original point
+    among them.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    order = np.lexsort((y, x))
+    x, y = x[order], y[order]
+    first = np.ones(len(x), dtype=bool)
+    first[1:] = (x[1:] != x[:-1]) | (y[1:] != y[:-1])
+    inverse = np.empty(len(x), dtype=np.intp)
+    inverse[order] = np.cumsum(first) - 1
+    return x[first], y[first], inverse
+
+
+def expand_ranges(starts, counts):
+    """
+    Returns the concatenation of the ranges [starts[i], starts[i] + counts[i]), without any Python loop.
+    :param starts: Integer array of the first value of each range.
+    :param counts: Integer array of the length of each range.
+    :return: Integer array of all the values of the ranges.
+    """
+    counts = np.asarray(counts)
+    ends = np.cumsum(counts)
+    return np.repeat(np.asarray(starts) - (ends - counts), counts) + np.arange(ends[-1] if len(ends) else 0)
+
+
+def membership_matrix(points, labels, n_points, n_labels):
+    """
+    Builds the sparse point x label matrix of a list of (point, label) pairs, in CSR layout.
+    Repeated pairs, such as a point lying in two rings of the same path, are only kept once.
+    :param points: Integer array of the point of each pair.
+    :param labels: Integer array of the label of each pair.
+    :param n_points: Number of points, rows of the matrix.
+    :param n_labels: Number of labels, columns of the matrix.
+    :return: Tuple (indptr, indices) : the labels of the point i are indices[indptr[i]:indptr[i + 1]], in ascending
+    order.
+    """
+    pairs = np.unique(np.asarray(points, dtype=np.int64) * n_labels + labels)
+    indptr = np.zeros(n_points + 1, dtype=np.int64)
+    np.cumsum(np.bincount(pairs // n_labels, minlength=n_points), out=indptr[1:])
+    return indptr, (pairs % n_labels).astype(np.int32)
+
+
+class BoxGrid:
+    """
+    BoxGrid is a uniform grid of buckets laid over a set of bounding boxes.
+    Each cell of the grid knows which boxes overlap it, so that a point only has to be tested against the few boxes
+    of its own cell instead of all of them.
+    """
+
+    def __init__(self, boxes, cells_per_side=None):
+        """
+        Constructor.
+        :param boxes: Array of shape (n, 4) of the bounding boxes. Form : (x_start, y_start, x_end, y_end)
+        :param cells_per_side: Number of cells on each side of the grid. By default, the square root of the number of
+        boxes, so that each cell holds about one box.
+        """
+        self.boxes_ = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        if len(self.boxes_):
+            self.extent_ = (self.boxes_[:, 0].min(), self.boxes_[:, 1].min(),
+                            self.boxes_[:, 2].max(), self.boxes_[:, 3].max())
+        else:
+            self.extent_ = (0., 0., 1., 1.)
+        n = cells_per_side or max(1, int(np.sqrt(len(self.boxes_))))
+        self.shape_ = (n, n)
+        self.cell_size_ = ((self.extent_[2] - self.extent_[0]) / n or 1., (self.extent_[3] - self.extent_[1]) / n or 1.)
+
+        # Every (box, cell) pair is enumerated at once, then sorted by cell to get a compressed layout.
+        cx0, cy0 = self.cell_of(self.boxes_[:, 0], self.boxes_[:, 1])
+        cx1, cy1 = self.cell_of(self.boxes_[:, 2], self.boxes_[:, 3])
+        widths = cx1 - cx0 + 1
+        counts = widths * (cy1 - cy0 + 1)
+        items = np.repeat(np.arange(len(self.boxes_)), counts)
+        rank = np.arange(len(items)) - np.repeat(np.cumsum(counts) - counts, counts)
+        cells = (cy0[items] + rank // widths[items]) * n + cx0[items] + rank % widths[items]
+        order = np.argsort(cells, kind="stable")
+        self.items_ = items[order]
+        self.offsets_ = np.concatenate(([0], np.cumsum(np.bincount(cells, minlength=n * n))))
+
+    def arrays(self, prefix=""):
+        """
+        Returns the arrays of the grid, to be saved and given back to from_arrays.
+        :param prefix: Prefix of the names of the arrays.
+        :return: Dictionary of the arrays by name.
+        """
+        return {prefix + "boxes": self.boxes_, prefix + "items": self.items_, prefix + "offsets": self.offsets_,
+                prefix + "extent": np.array(self.extent_), prefix + "shape": np.array(self.shape_),
+                prefix + "cell_size": np.array(self.cell_size_)}
+
+    @classmethod
+    def from_arrays(cls, arrays, prefix=""):
+        """
+        Restores a grid from the arrays returned by arrays, without computing it again.
+        :param arrays: Dictionary of the arrays by name.
+        :param prefix: Prefix of the names of the arrays.
+        :return: The BoxGrid.
+        """
+        grid = cls.__new__(cls)
+        grid.boxes_ = arrays[prefix + "boxes"]
+        grid.items_ = arrays[prefix + "items"]
+        grid.offsets_ = arrays[prefix + "offsets"]
+        grid.extent_ = tuple(arrays[prefix + "extent"].tolist())
+        grid.shape_ = tuple(arrays[prefix + "shape"].tolist())
+        grid.cell_size_ = tuple(arrays[prefix + "cell_size"].tolist())
+        return grid
+
+    def cell_of(self, x, y):
+        """
+        Returns the column and row of the cells containing the points, clipped to the grid.
+        :param x: Array of x coordinates.
+        :param y: Array of y coordinates.
+        :return: Tuple of integer arrays (column, row).
+        """
+        column = np.floor((np.asarray(x) - self.extent_[0]) / self.cell_size_[0])
+        row = np.floor((np.asarray(y) - self.extent_[1]) / self.cell_size_[1])
+        return np.clip(column, 0, self.shape_[0] - 1).astype(np.intp), \
+            np.clip(row, 0, self.shape_[1] - 1).astype(np.intp)
+
+    def cell_ids(self, x, y):
+        """
+        Returns the flat index of the cells containing the points.
+        :param x: Array of x coordinates.
+        :param y: Array of y coordinates.
+        :return: Integer array of cell indices, or -1 for the points outside of the grid.
+        """
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        outside = ~((x >= self.extent_[0]) & (x <= self.extent_[2]) & (y >= self.extent_[1]) & (y <= self.extent_[3]))
+        # The points outside, non-finite coordinates included, are moved into the grid before computing their cell
+        column, row = self.cell_of(np.where(outside, self.extent_[0], x), np.where(outside, self.extent_[1], y))
+        return np.where(outside, -1, row * self.shape_[0] + column)
+
+    def candidates(self, point):
+        """
+        Returns the boxes that contain a point, in ascending order.
+        :param point: A tuple of coordinates (x, y).
+        :return: Integer array of the indices of the boxes.
+        """
+        cell = self.cell_ids(point[0], point[1])
+        if cell < 0:
+            return self.items_[:0]
+        items = self.items_[self.offsets_[cell]:self.offsets_[cell + 1]]
+        boxes = self.boxes_[items]
+        return items[(boxes[:, 0] <= point[0]) & (point[0] <= boxes[:, 2]) &
+                     (boxes[:, 1] <= point[1]) & (point[1] <= boxes[:, 3])]
+
+    def sort_points(self, x, y):
+        """
+        Sorts points by cell, to be used with points_in_box.
+        :param x: Array of x coordinates.
+        :param y: Array of y coordinates.
+        :return: Tuple (order, cells) of the permutation sorting the points and of their sorted cell indices.
+        """
+        cells = self.cell_ids(x, y)
+        order = np.argsort(cells, kind="stable")
+        return order, cells[order]
+
+    def points_in_box(self, item, order, sorted_cells):
+        """
+        Returns the points lying in the cells overlapped by one of the boxes.
+        :param item: Index of the box.
+        :param order: Permutation returned by sort_points.
+        :param sorted_cells: Sorted cell indices returned by sort_points.
+        :return: Integer array of the indices of the points, which still have to be tested against the box itself.
+        """
+        box = self.boxes_[item]
+        cx0, cy0 = self.cell_of(box[0], box[1])
+        cx1, cy1 = self.cell_of(box[2], box[3])
+        rows = np.arange(cy0, cy1 + 1) * self.shape_[0]
+        starts = np.searchsorted(sorted_cells, rows + cx0, side="left")
+        ends = np.searchsorted(sorted_cells, rows + cx1, side="right")
+        return np.concatenate([order[s:e] for s, e in zip(starts, ends)] or [order[:0]])
+
+
+class SegmentIndex:
+    """
+    SegmentIndex finds the closest segment of a set of polygon sides, within a maximal distance.
+    The segments are stored as contiguous arrays and bucketed in a BoxGrid of their bounding boxes, so that a point
+    is only compared to the segments lying in its neighbourhood.
+    """
+
+    # Maximal number of point-segment distances computed at once
+    block_size = 1 << 20
+
+    def __init__(self, starts, ends, labels):
+        """
+        Constructor.
+        :param starts: Array of shape (n, 2) of the first apex of each segment.
+        :param ends: Array of shape (n, 2) of the second apex of each segment.
+        :param labels: Array of the label (index of the path) of each segment.
+        """
+        self.starts_ = np.asarray(starts, dtype=np.float64).reshape(-1, 2)
+        self.vectors_ = np.asarray(ends, dtype=np.float64).reshape(-1, 2) - self.starts_
+        self.lengths_squared_ = (self.vectors_ ** 2).sum(axis=1)
+        self.labels_ = np.asarray(labels, dtype=np.int32)
+        self.grid_ = BoxGrid(np.hstack((np.minimum(self.starts_, self.starts_ + self.vectors_),
+                                        np.maximum(self.starts_, self.starts_ + self.vectors_))))
+
+    def arrays(self, prefix=""):
+        """
+        Returns the arrays of the index, to be saved and given back to from_arrays.
+        :param prefix: Prefix of the names of the arrays.
+        :return: Dictionary of the arrays by name.
+        """
+        return dict({prefix + "starts": self.starts_, prefix + "vectors": self.vectors_,
+                     prefix + "lengths_squared": self.lengths_squared_, prefix + "labels": self.labels_},
+                    **self.grid_.arrays(prefix + "grid_"))
+
+    @classmethod
+    def from_arrays(cls, arrays, prefix=""):
+        """
+        Restores an index from the arrays returned by arrays, without computing it again.
+        :param arrays: Dictionary of the arrays by name.
+        :param prefix: Prefix of the names of the arrays.
+        :return: The SegmentIndex.
+        """
+        index = cls.__new__(cls)
+        index.starts_ = arrays[prefix + "starts"]
+        index.vectors_ = arrays[prefix + "vectors"]
+        index.lengths_squared_ = arrays[prefix + "lengths_squared"]
+        index.labels_ = arrays[prefix + "labels"]
+        index.grid_ = BoxGrid.from_arrays(arrays, prefix + "grid_")
+        return index
+
+    def distances(self, x, y, segments):
+        """
+        Returns the distances of points to the closest point of segments, pair by pair.
+        :param x: Array of x coordinates of the points.
+        :param y: Array of y coordinates of the points.
+        :param segments: Array of the indices of the segments, one for each point.
+        :return: Array of the distances.
+        """
+        dx = x - self.starts_[segments, 0]
+        dy = y - self.starts_[segments, 1]
+        vx, vy = self.vectors_[segments, 0], self.vectors_[segments, 1]
+        l2 = self.lengths_squared_[segments]
+        t = np.clip(np.divide(dx * vx + dy * vy, l2, out=np.zeros_like(dx), where=l2 > 0), 0, 1)
+        return np.hypot(dx - t * vx, dy - t * vy)
+
+    def closest(self, x, y, max_distance):
+        """
+        Returns the label of the closest segment of each point, if it lies within max_distance.
+        When several segments are at the same distance, the first one wins.
+        Every point is compared to the segments of the cells around its own, starting with its closest cells. The
+        points whose closest segment can't be beyond those cells are done, and the others are searched again in a
+        twice larger neighbourhood, up to max_distance. For each neighbourhood, the (point, segment) pairs of whole
+        groups of cells are measured at once, and the closest segment of each point is found by a reduction over its
+        pairs.
+        :param x: Array of x coordinates of the points.
+        :param y: Array of y coordinates of the points.
+        :param max_distance: Maximal distance between a point and its closest segment.
+        :return: Tuple of arrays (labels, distances). Labels are -1 and distances inf for the points too far away, or
+        whose coordinates aren't finite.
+        """
+        x = np.asarray(x, dtype=np.float64).ravel()
+        y = np.asarray(y, dtype=np.float64).ravel()
+        labels = np.full(len(x), -1, dtype=np.int32)
+        best = np.full(len(x), np.inf)
+        points = np.flatnonzero(np.isfinite(x) & np.isfinite(y))
+        if not len(points) or not len(self.labels_):
+            return labels, best
+        grid = self.grid_
+        n_columns, n_rows = grid.shape_
+        # Any segment within max_distance of a point overlaps the rectangle of cells around the cell of the point
+        max_reach = (int(min(np.ceil(max_distance / grid.cell_size_[0]), n_columns)),
+                     int(min(np.ceil(max_distance / grid.cell_size_[1]), n_rows)))
+        # Number of segments of the cells (repeated segments included) as a summed-area table, to size the blocks
+        table = np.zeros((n_rows + 1, n_columns + 1), dtype=np.int64)
+        table[1:, 1:] = np.diff(grid.offsets_).reshape(n_rows, n_columns).cumsum(axis=0).cumsum(axis=1)
+        reach = 1
+        while len(points):
+            current = (min(reach, max_reach[0]), min(reach, max_reach[1]))
+            self._closest_around(x, y, points, current, table, labels, best)
+            if current == max_reach:
+                break
+            # Distance from each point to the closest side of the cells searched, the sides of the grid excepted
+            column, row = grid.cell_of(x[points], y[points])
+            sides = []
+            for coordinate, cell, reach_, size, start, n in ((x, column, current[0], grid.cell_size_[0],
+                                                               grid.extent_[0], n_columns),
+                                                              (y, row, current[1], grid.cell_size_[1],
+                                                               grid.extent_[1], n_rows)):
+                sides.append(np.where(cell - reach_ > 0, coordinate[points] - start - (cell - reach_) * size, np.inf))
+                sides.append(np.where(cell + reach_ + 1 < n, start + (cell + reach_ + 1) * size - coordinate[points],
+                                      np.inf))
+            covered = np.minimum.reduce(sides)
+            points = points[~((best[points] < covered) | (covered >= max_distance))]
+            reach *= 2
+        too_far = ~(best <= max_distance)
+        labels[too_far] = -1
+        best[too_far] = np.inf
+        return labels, best
+
+    def _closest_around(self, x, y, points, reach, table, labels, best):
+        # Closest segment of each point among the ones of the cells within reach of its own
+        grid = self.grid_
+        n_columns, n_rows = grid.shape_
+        column, row = grid.cell_of(x[points], y[points])
+        point_cells = row * n_columns + column
+        order = np.argsort(point_cells, kind="stable")
+        points = points[order]
+        cells, cell_starts, cell_sizes = np.unique(point_cells[order], return_index=True, return_counts=True)
+        columns, rows = cells % n_columns, cells // n_columns
+        c0, c1 = np.maximum(columns - reach[0], 0), np.minimum(columns + reach[0], n_columns - 1) + 1
+        r0, r1 = np.maximum(rows - reach[1], 0), np.minimum(rows + reach[1], n_rows - 1) + 1
+        around = table[r1, c1] - table[r0, c1] - table[r1, c0] + table[r0, c0]
+        # Groups of consecutive cells whose candidate segments fit in a block
+        costs = around + (2 * reach[0] + 1) * (2 * reach[1] + 1)
+        groups = (np.cumsum(costs) - costs) // self.block_size
+        bounds = np.concatenate(([0], np.flatnonzero(np.diff(groups)) + 1, [len(cells)]))
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            self._closest_cells(x, y, points, cells[start:end], cell_starts[start:end], cell_sizes[start:end],
+                                reach, labels, best)
+
+    def _closest_cells(self, x, y, points, cells, cell_starts, cell_sizes, reach, labels, best):
+        # Candidate segments of each cell : the segments of the cells around it. A segment crossing several of those
+        # cells is repeated, which only measures it again
+        grid = self.grid_
+        n_columns, n_rows = grid.shape_
+        dx, dy = np.meshgrid(np.arange(-reach[0], reach[0] + 1), np.arange(-reach[1], reach[1] + 1))
+        around_columns = (cells % n_columns)[:, None] + dx.ravel()
+        around_rows = (cells // n_columns)[:, None] + dy.ravel()
+        inside = (around_columns >= 0) & (around_columns < n_columns) & (around_rows >= 0) & (around_rows < n_rows)
+        around = around_rows[inside] * n_columns + around_columns[inside]
+        counts = grid.offsets_[around + 1] - grid.offsets_[around]
+        candidates = grid.items_[expand_ranges(grid.offsets_[around], counts)]
+        candidate_offsets = np.concatenate(([0], np.cumsum(np.bincount(np.nonzero(inside)[0], weights=counts,
+                                                                       minlength=len(cells)).astype(np.int64))))
+
+        # Then the pairs of each point of the cells with the candidates of its cell, by blocks of points
+        owners = np.repeat(np.arange(len(cells)), cell_sizes)
+        block_points = points[cell_starts[0]:cell_starts[-1] + cell_sizes[-1]]
+        pair_counts = np.diff(candidate_offsets)[owners]
+        kept = pair_counts > 0
+        block_points, owners, pair_counts = block_points[kept], owners[kept], pair_counts[kept]
+        if not len(block_points):
+            return
+        blocks = (np.cumsum(pair_counts) - pair_counts) // self.block_size
+        bounds = np.concatenate(([0], np.flatnonzero(np.diff(blocks)) + 1, [len(block_points)]))
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            counts = pair_counts[start:end]
+            pair_segments = candidates[expand_ranges(candidate_offsets[owners[start:end]], counts)]
+            pair_points = np.repeat(block_points[start:end], counts)
+            distances = self.distances(x[pair_points], y[pair_points], pair_segments)
+            # Lowest segment of each point among the ones at its minimal distance
+            starts = np.cumsum(counts) - counts
+            closest = np.minimum.reduceat(distances, starts)
+            first = np.minimum.reduceat(np.where(distances == np.repeat(closest, counts), pair_segments,
+                                                 len(self.labels_)), starts)
+            labels[block_points[start:end]] = self.labels_[first]
+            best[block_points[start:end]] = closest
+
+
+class LabelRaster:
+    """
+    LabelRaster is a grid holding the label of the path containing each of its cells.
+    The cells crossed by a side of a polygon are flagged, so that their points are tested exactly. Every other cell
+    lies entirely inside a single path, or outside of all of them, and answers directly.
+    """
+
+    # Label of the cells crossed by a side of a polygon
+    BOUNDARY = -2
+
+    def __init__(self, extent, shape, starts, ends, label_points):
+        """
+        Constructor.
+        :param extent: Box covered by the grid. Form : (x_start, y_start, x_end, y_end)
+        :param shape: Number of cells (columns, rows) of the grid.
+        :param starts: Array of shape (n, 2) of the first apex of each side of the polygons.
+        :param ends: Array of shape (n, 2) of the second apex of each side of the polygons.
+        :param label_points: Function giving the exact labels (or -1) of arrays of x and y coordinates.
+        """
+        self.extent_ = tuple(float(v) for v in extent)
+        self.shape_ = (max(1, int(shape[0])), max(1, int(shape[1])))
+        self.cell_size_ = ((self.extent_[2] - self.extent_[0]) / self.shape_[0] or 1.,
+                           (self.extent_[3] - self.extent_[1]) / self.shape_[1] or 1.)
+        starts = np.asarray(starts, dtype=np.float64).reshape(-1, 2)
+        vectors = np.asarray(ends, dtype=np.float64).reshape(-1, 2) - starts
+
+        # Cutting the sides in pieces shorter than a cell, so that each piece only overlaps 2x2 cells at most
+        pieces = np.ceil(np.maximum(np.abs(vectors[:, 0]) / self.cell_size_[0],
+                                    np.abs(vectors[:, 1]) / self.cell_size_[1])).astype(np.intp) + 1
+        segments = np.repeat(np.arange(len(starts)), pieces)
+        t = (np.arange(len(segments)) - np.repeat(np.cumsum(pieces) - pieces, pieces)) / pieces[segments]
+        piece_starts = starts[segments] + t[:, None] * vectors[segments]
+        piece_ends = piece_starts + vectors[segments] / pieces[segments, None]
+        boundary = np.zeros(self.shape_[::-1], dtype=bool)
+        for x, y in ((piece_starts[:, 0], piece_starts[:, 1]), (piece_starts[:, 0], piece_ends[:, 1]),
+                     (piece_ends[:, 0], piece_starts[:, 1]), (piece_ends[:, 0], piece_ends[:, 1])):
+            column, row = self.cell_of(x, y)
+            boundary[row, column] = True
+
+        # The other cells take the label of their center
+        rows, columns = np.nonzero(~boundary)
+        self.labels_ = np.full(self.shape_[::-1], self.BOUNDARY, dtype=np.int32)
+        self.labels_[rows, columns] = label_points(self.extent_[0] + (columns + .5) * self.cell_size_[0],
+                                                   self.extent_[1] + (rows + .5) * self.cell_size_[1])
+
+    def cell_of(self, x, y):
+        """
+        Returns the column and row of the cells containing the points, clipped to the grid.
+        :param x: Array of x coordinates.
+        :param y: Array of y coordinates.
+        :return: Tuple of integer arrays (column, row).
+        """
+        column = np.floor((np.asarray(x) - self.extent_[0]) / self.cell_size_[0])
+        row = np.floor((np.asarray(y) - self.extent_[1]) / self.cell_size_[1])
+        return np.clip(column, 0, self.shape_[0] - 1).astype(np.intp), \
+            np.clip(row, 0, self.shape_[1] - 1).astype(np.intp)
+
+    def lookup(self, x, y):
+        """
+        Returns the labels of the cells containing the points.
+        :param x: Array of x coordinates.
+        :param y: Array of y coordinates.
+        :return: Array of the labels, -1 for the points outside of the grid, or BOUNDARY for the points to be tested.
+        """
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        inside = (x >= self.extent_[0]) & (x <= self.extent_[2]) & (y >= self.extent_[1]) & (y <= self.extent_[3])
+        column, row = self.cell_of(np.where(inside, x, self.extent_[0]), np.where(inside, y, self.extent_[1]))
+        return np.where(inside, self.labels_[row, column], -1).astype(np.int32)
+
+
+class Stats:
+    """
+    Stats accumulates the work done by a Polygoniser : files read, points classified, containment tests, points
+    imputed and time spent in each phase. Recording a call only costs a few additions, so it can always stay on.
+    """
+    def __init__(self, hook=None):
+        """
+        Constructor.
+        :param hook: Callable called after each recorded call as hook(event, record), where event is the name of the
+        call ("read_files", "findContainer", "mapLabels" or "mapContainers") and record a dictionary of what it did :
+        "files", "points", "containment_tests", "imputed_points" and "seconds" (dictionary of the seconds spent by
+        phase).
+        """
+        self.hook = hook
+        self.reset()
+
+    def reset(self):
+        """
+        Sets all the counters back to zero.
+        """
+        self.files = 0
+        self.points = 0
+        self.containment_tests = 0
+        self.imputed_points = 0
+        self.seconds = {}
+
+    def record(self, event, seconds, files=0, points=0, containment_tests=0, imputed_points=0):
+        """
+        Adds the work of a call to the counters, and gives it to the hook.
+        :param event: Name of the call.
+        :param seconds: Dictionary of the seconds spent by phase.
+        :param files: Number of files read.
+        :param points: Number of points classified.
+        :param containment_tests: Number of point-in-polygon tests.
+        :param imputed_points: Number of points that went through the imputation.
+        """
+        self.files += files
+        self.points += points
+        self.containment_tests += containment_tests
+        self.imputed_points += imputed_points
+        for phase, value in seconds.items():
+            self.seconds[phase] = self.seconds.get(phase, 0.) + value
+        if self.hook is not None:
+            self.hook(event, {"files": files, "points": points, "containment_tests": containment_tests,
+                              "imputed_points": imputed_points, "seconds": seconds})
+
+    def __getstate__(self):
+        # The hook, often a closure or a lambda, isn't sent to the worker processes
+        state = self.__dict__.copy()
+        state["hook"] = None
+        return state
+
+
+class SharedPickler(pickle.Pickler):
+    """
+    SharedPickler pickles objects while placing their numpy arrays in shared memory blocks instead of the stream,
+    so that other processes can use them without copying them. The blocks are appended to the given list and must
+    be closed and unlinked by the caller once the other processes are done.
+    """
+
+    def __init__(self, file, blocks):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.blocks = blocks
+
+    def persistent_id(self, obj):
+        if not isinstance(obj, np.ndarray) or obj.dtype.hasobject or not obj.nbytes:
+            return None
+        block = shared_memory.SharedMemory(create=True, size=obj.nbytes)
+        np.ndarray(obj.shape, obj.dtype, buffer=block.buf)[...] = obj
+        self.blocks.append(block)
+        return block.name, obj.shape, obj.dtype.str
+
+
+class SharedUnpickler(pickle.Unpickler):
+    """
+    SharedUnpickler loads objects pickled by SharedPickler, attaching their arrays to the shared memory blocks.
+    The blocks are appended to the given list and must stay open as long as the arrays are used.
+    """
+
+    def __init__(self, file, blocks):
+        super().__init__(file)
+        self.blocks = blocks
+
+    def persistent_load(self, pid):
+        name, shape, dtype = pid
+        block = shared_memory.SharedMemory(name=name)
+        self.blocks.append(block)
+        return np.ndarray(shape, dtype, buffer=block.buf)
+
+
+def share(obj, blocks):
+    """
+    Pickles an object with SharedPickler.
+    :param obj: Object to share.
+    :param blocks: List to which the shared memory blocks created are appended.
+    :return: The pickled bytes, holding the names of the blocks instead of the content of the arrays.
+    """
+    stream = io.BytesIO()
+    SharedPickler(stream, blocks).dump(obj)
+    return stream.getvalue()
+
+
+def attach(data, blocks):
+    """
+    Unpickles an object pickled by share, without copying its arrays.
+    :param data: Bytes returned by share.
+    :param blocks: List to which the shared memory blocks attached are appended.
+    :return: The object.
+    """
+    return SharedUnpickler(io.BytesIO(data), blocks).load()
+
+
+# Polygoniser and arrays shared with the current worker process of map_labels_parallel
+_worker_state = {}
+
+
+def _init_worker(data, labels_name, size):
+    _worker_state["blocks"] = []
+    _worker_state["polygoniser"], _worker_state["x"], _worker_state["y"] = attach(data, _worker_state["blocks"])
+    _worker_state["blocks"].append(shared_memory.SharedMemory(name=labels_name))
+    _worker_state["labels"] = np.ndarray(size, np.int32, buffer=_worker_state["blocks"][-1].buf)
+
+
+def _map_chunk(start, stop, percent_impute):
+    _worker_state["labels"][start:stop] = _worker_state["polygoniser"].mapLabels(
+        _worker_state["x"][start:stop], _worker_state["y"][start:stop], percent_impute=percent_impute)
+
+
+def map_labels_parallel(polygoniser, x, y, percent_impute=None, n_jobs=-1, chunk_size=None):
+    """
+    Computes the mapLabels of a Polygoniser in a pool of processes.
+    The geometry, the coordinates and the output array are placed once in shared memory. Each worker attaches to
+    them when it starts, then classifies chunks of rows and writes their labels in place in the output.
+    :param polygoniser: Polygoniser of any backend.
+    :param x: Array of x coordinates, in the data_box_ coordinate system.
+    :param y: Array of y coordinates, in the data_box_ coordinate system.
+    :param percent_impute: Percent of the view port that a point should be given a belonging if it is outside of
+    all polygons.
+    :param n_jobs: Number of processes. Negative values count back from the number of CPUs (-1 uses all of them).
+    :param chunk_size: Number of rows of each task. By default, four tasks per process.
+    :return: An int32 array of the labels, identical to the one of mapLabels.
+    """
+    if n_jobs < 0:
+        n_jobs = max(1, (os.cpu_count() or 1) + 1 + n_jobs)
+    labels = np.full(len(x), -1, dtype=np.int32)
+    if not len(x):
+        return labels
+    chunk_size = chunk_size or -(-len(x) // (4 * n_jobs))
+    blocks = [shared_memory.SharedMemory(create=True, size=labels.nbytes)]
+    try:
+        data = share((polygoniser, np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)), blocks)
+        with ProcessPoolExecutor(n_jobs, initializer=_init_worker, initargs=(data, blocks[0].name, len(x))) \
+                as executor:
+            for future in [executor.submit(_map_chunk, start, min(start + chunk_size, len(x)), percent_impute)
+                           for start in range(0, len(x), chunk_size)]:
+                future.result()
+        labels[:] = np.ndarray(labels.shape, labels.dtype, buffer=blocks[0].buf)
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+    return labels
+
+
+class BasePolygoniser:
+    """
+    BasePolygoniser holds what the SVGPolygoniser and SVGShapeliser backends share : the flat geometry read from the
+    SVG files, its metrics and caches, and the classification methods built on top of the few primitives that each
+    backend implements with its own library : build_index, index_arrays, rings_, find_container_uncached,
+    closest_polygon, contain_labels and contain_pairs.
+    """
+    def __init__(self, path_files, box=None, invert_y=True, cache_dir=None, lookup_cache_size=None,
+                 lookup_decimals=None, stats_hook=None):
+        """
+        Constructor.
+        :param path_files: For the moment, path_files can only be a string representing a SVG file with multiple paths.
+        :param box: Box in which to scale the point coordinates. Form : (x_start, y_start, x_end, y_end)
+        :param invert_y: tells if the y coordinates are inverted. Specifically, pictures have a reverse y coordinate
+        ((0,0) is the upper left corner of the picture).
+        :param cache_dir: Folder in which the geometry read from the SVG files is cached. Later Polygonisers built on
+        the same file with the same parameters load it from there instead of reading the file again.
+        :param lookup_cache_size: If given, findContainer keeps the results of that many recent points, and answers
+        the same points again without any test.
+        :param lookup_decimals: If given, findContainer rounds the coordinates to that many decimals before
+        classifying them, so that nearby points share the same entry of the lookup cache.
+        :param stats_hook: Callable called after each read_files, findContainer, mapLabels and mapContainers as
+        stats_hook(event, record), with the record of the work of the call (see SVGGeometry.Stats).
+        """
+        self.data_box_ = box
+        self.view_box_ = None
+        self.invert_y = invert_y
+        self.cache_dir = cache_dir
+        # Flat geometry of all the paths read : the vertices of the ring r are
+        # vertices_[ring_offsets_[r]:ring_offsets_[r + 1]], the rings of the path p go from path_offsets_[p] to
+        # path_offsets_[p + 1], and ids_[p] is its name.
+        self.ids_ = []
+        self.vertices_ = np.empty((0, 2))
+        self.ring_offsets_ = np.zeros(1, dtype=np.int64)
+        self.path_offsets_ = np.zeros(1, dtype=np.int64)
+        self.ring_labels_ = np.zeros(0, dtype=np.int32)
+        # The objects of the backend are only created from the flat geometry when they are needed
+        self._rings = None
+        self._polygons = None
+        self.raster_ = None
+        self.lookup_cache_size = lookup_cache_size
+        self.lookup_decimals = lookup_decimals
+        self._lookup_cache = OrderedDict()
+        self.lookup_hits_ = 0
+        self.lookup_misses_ = 0
+        self.stats_ = Stats(stats_hook)
+        # Running total of the point-in-polygon tests of contain_labels and contain_pairs
+        self._containment_tests = 0
+        # if isinstance(path_files, list):
+        #     for filepath in path_files:
+        #         sep_index = max(filepath.rfind(os.sep), 0)
+        #         comma_index = filepath[sep_index:].find(".")
+        #         if comma_index == -1:
+        #             comma_index = len(filepath[sep_index:])
+        #         infered_name = filepath[sep_index:comma_index]
+        #         self.polygons_[infered_name] = self.read_files(filepath)
+        # elif isinstance(path_files, dict):
+        #     for name, filepath in path_files:
+        #         self.polygons_[name] = self.read_files(filepath)
+        # else:
+        #     self.polygons_[path_files] = self.read_files(path_files)
+        if isinstance(path_files, str):
+            self.read_files(path_files)
+        else:
+            raise TypeError("For now, %s works for a single SVG (with multiple paths) only." % type(self).__module__)
+
+    def __repr__(self):
+        return "Polygoniser(" + str(self.ids_) + ", view_box = " + str(self.view_box_) + ", graph_box = " + \
+               str(self.data_box_) + ")"
+
+    @classmethod
+    def merge(cls, polygonisers):
+        """
+        Builds a Polygoniser holding the paths of several others one after the other, from their flat geometries and
+        without reading their files again. They must have been built with the same box and invert_y.
+        :param polygonisers: List of Polygonisers of the same backend.
+        :return: The new Polygoniser, whose paths of polygonisers[k] start at sum(len(p.ids_) for p in
+        polygonisers[:k]).
+        """
+        merged = cls.__new__(cls)
+        merged.__dict__.update(polygonisers[0].__getstate__())
+        merged.cache_dir = None
+        merged._lookup_cache = OrderedDict()
+        merged.lookup_hits_ = 0
+        merged.lookup_misses_ = 0
+        merged.stats_ = Stats()
+        merged._containment_tests = 0
+        merged.ids_ = [name for polygoniser in polygonisers for name in polygoniser.ids_]
+        merged.vertices_ = np.concatenate([polygoniser.vertices_ for polygoniser in polygonisers])
+        ring_counts = np.concatenate([np.diff(polygoniser.ring_offsets_) for polygoniser in polygonisers])
+        path_counts = np.concatenate([np.diff(polygoniser.path_offsets_) for polygoniser in polygonisers])
+        merged.ring_offsets_ = np.concatenate(([0], np.cumsum(ring_counts))).astype(np.int64)
+        merged.path_offsets_ = np.concatenate(([0], np.cumsum(path_counts))).astype(np.int64)
+        merged.build_index()
+        return merged
+
+    def read_files(self, path_file):
+        """
+        Reads a SVG file and appends the rings of the polygons that surround each of its paths to the flat geometry.
+        The paths are converted one by one into a single array, whose coordinates are scaled into the data_box_ at once.
+        If a cache_dir was given, the geometry is loaded from the cache when the file was already read with the same
+        parameters, and saved into it otherwise.
+        :param path_file: Absolute or relative filepath to the SVG file.
+        """
+        start = time.perf_counter()
+        key = None if self.cache_dir is None else \
+            cache_key(path_file, backend=type(self).__module__, box=self.data_box_, invert_y=self.invert_y)
+        cached = None if key is None else load_cache(self.cache_dir, key)
+        if cached is None:
+            read_view_box, ids, vertices, ring_offsets, path_offsets = read_svg(path_file)
+        else:
+            read_view_box = None if cached[0]["view_box"] is None else tuple(cached[0]["view_box"])
+            ids = cached[0]["ids"]
+            vertices, ring_offsets, path_offsets = \
+                cached[1]["vertices"], cached[1]["ring_offsets"], cached[1]["path_offsets"]
+        self.view_box_ = check_view_box(read_view_box, self.view_box_)
+        if cached is None and ids:
+            vertices = np.column_stack(self.scale_array(vertices[:, 0], vertices[:, 1]))
+
+        parsed = time.perf_counter()
+        first_file = not self.ids_
+        if first_file:
+            # Keeping the memory-mapped arrays of the cache as they are
+            self.vertices_, self.ring_offsets_, self.path_offsets_ = vertices, ring_offsets, path_offsets
+        else:
+            self.vertices_ = np.concatenate((self.vertices_, vertices))
+            self.ring_offsets_ = np.concatenate((self.ring_offsets_[:-1], ring_offsets + self.ring_offsets_[-1]))
+            self.path_offsets_ = np.concatenate((self.path_offsets_[:-1], path_offsets + self.path_offsets_[-1]))
+        self.ids_ = self.ids_ + list(ids)
+        self.build_index(cached[1] if cached is not None and first_file else None)
+        indexed = time.perf_counter()
+
+        if key is not None and cached is None:
+            arrays = {"vertices": vertices, "ring_offsets": ring_offsets, "path_offsets": path_offsets}
+            save_cache(self.cache_dir, key, {"view_box": read_view_box, "ids": ids, "box": self.data_box_,
+                                             "invert_y": self.invert_y},
+                       dict(arrays, **self.index_arrays()) if first_file else arrays)
+        self.stats_.record("read_files", {"parse": parsed - start, "index": indexed - parsed,
+                                          "cache": time.perf_counter() - indexed}, files=1)
+
+    def build_index(self, arrays=None):
+        """
+        Computes what every backend needs from the flat geometry : the path of each ring, the index of the paths by
+        name and their metrics. Each backend then builds its own spatial index on top of them.
+        :param arrays: Arrays previously returned by index_arrays for the same geometry, to restore the index from.
+        """
+        self.ring_labels_ = np.repeat(np.arange(len(self.ids_), dtype=np.int32), np.diff(self.path_offsets_))
+        self._rings = None
+        self._polygons = None
+        self.raster_ = None
+        self._lookup_cache.clear()
+        self.path_index_ = {}
+        for i, name in enumerate(self.ids_):
+            self.path_index_.setdefault(name, i)
+        # Metrics of all the rings and paths, computed once for all
+        self.ring_metrics_, self.metrics_ = geometry_metrics(self.vertices_, self.ring_offsets_, self.path_offsets_)
+
+    @property
+    def polygons_(self):
+        """
+        Dictionary of the list of polygons of each path, by name, created on first use.
+        """
+        if self._polygons is None:
+            self._polygons = {k: list(self.rings_[self.path_offsets_[i]:self.path_offsets_[i + 1]])
+                              for i, k in enumerate(self.ids_)}
+        return self._polygons
+
+    def get_rings(self, polygon_name):
+        """
+        Returns the vertices of the rings of a path, as views on the flat geometry.
+        :param polygon_name: Name of the path.
+        :return: List of arrays of shape (n, 2).
+        """
+        i = self.path_index(polygon_name)
+        return [self.vertices_[self.ring_offsets_[r]:self.ring_offsets_[r + 1]]
+                for r in range(self.path_offsets_[i], self.path_offsets_[i + 1])]
+
+    def __getstate__(self):
+        # Only the flat arrays are serialised, the objects built from them are created again on demand
+        state = self.__dict__.copy()
+        state["_rings"] = state["_polygons"] = None
+        return state
+
+    def findContainer(self, point, in_view_box=False, percent_impute=None):
+        """
+        Return the name of the polygon which contains the point.
+        Warning : it may produce an unpredictable return key if the files previously fed into the constructor of the
+        class showed overlapping paths. mapContainers gives all the polygons containing a point.
+        :param in_view_box: Boolean that tells if the coordinates to be considered are the view_box's original ones.
+        :param point: A tuple of of coordinates (x, y)
+        :param percent_impute: Percent of the view port that a point should be given a belonging if it is outside of
+        all polygons.
+        :return: The name of the polygon, or None if the point is outside every polygon.
+        """
+        if self.lookup_decimals is not None:
+            point = (round(point[0], self.lookup_decimals), round(point[1], self.lookup_decimals))
+        if not self.lookup_cache_size:
+            return self.find_container_uncached(point, in_view_box, percent_impute)
+        key = (point[0], point[1], in_view_box, percent_impute)
+        if key in self._lookup_cache:
+            self.lookup_hits_ += 1
+            self._lookup_cache.move_to_end(key)
+            return self._lookup_cache[key]
+        self.lookup_misses_ += 1
+        container = self._lookup_cache[key] = self.find_container_uncached(point, in_view_box, percent_impute)
+        if len(self._lookup_cache) > self.lookup_cache_size:
+            self._lookup_cache.popitem(last=False)
+        return container
+
+    def impute_distance(self, percent_impute):
+        """
+        Converts a percent of the data_box_'s diagonal into a distance.
+        :param percent_impute: Percent of the diagonal.
+        :return: The corresponding distance in the data_box_ coordinate system.
+        """
+        diag = ((self.data_box_[2]-self.data_box_[0])**2+(self.data_box_[3]-self.data_box_[1])**2)**0.5
+        return percent_impute * diag / 100
+
+    def lookup_cache_info(self):
+        """
+        Returns the statistics of the lookup cache of findContainer.
+        :return: Dictionary of the hits, misses, current size and maximal size of the cache.
+        """
+        return {"hits": self.lookup_hits_, "misses": self.lookup_misses_, "size": len(self._lookup_cache),
+                "max_size": self.lookup_cache_size}
+
+    def stats(self):
+        """
+        Returns what the Polygoniser has done so far, to find where the time goes. The containment tests made by the
+        worker processes of mapLabels(n_jobs=...) aren't counted.
+        :return: Dictionary of the sizes of the geometry ("paths", "rings", "vertices"), of the number of "files" read
+        and of the "parse_seconds" spent reading them, of the number of "points" classified, of the
+        "containment_tests" made and the "tests_per_point", of the "imputed_points" that reached the imputation and
+        their "impute_fraction", of the "lookup_hits" of the lookup cache, and of the "seconds" spent by phase.
+        """
+        stats = self.stats_
+        return {"paths": len(self.ids_), "rings": len(self.ring_offsets_) - 1, "vertices": len(self.vertices_),
+                "files": stats.files, "parse_seconds": stats.seconds.get("parse", 0.), "points": stats.points,
+                "containment_tests": stats.containment_tests,
+                "tests_per_point": stats.containment_tests / stats.points if stats.points else 0.,
+                "imputed_points": stats.imputed_points,
+                "impute_fraction": stats.imputed_points / stats.points if stats.points else 0.,
+                "lookup_hits": self.lookup_hits_, "seconds": dict(stats.seconds)}
+
+    def reset_stats(self):
+        """
+        Sets the counters of stats back to zero. The sizes of the geometry are kept.
+        """
+        self.stats_.reset()
+        self.lookup_hits_ = 0
+        self.lookup_misses_ = 0
+
+    def mapBelongings(self, x_series, y_series, in_view_box=False, percent_impute=None, output="list"):
+        """
+        Gets lists of coordinates and return the polygon names to which they belong or None.
+        :param x_series: List of x coordinates.
+        :param y_series: List of y coordinates.
+        :param in_view_box: Boolean that tells if the coordinates to be considered are the view_box's original ones.
+        :param percent_impute: If a value is given, the mapper will test diverse positions to find the closest polygon
+        up to the value given in percents as a distance relative to the viewport size.
+        :param output: Form of the result. "list" gives a list of names, "codes" a tuple (codes, names) of an int32
+        array of codes (-1 for no polygon) and of the list of names they refer to, and "categorical" a
+        pandas.Categorical of the names, whose categories are the distinct names.
+        :return: The polygons names containing each respective point, in the form asked by output.
+        """
+        return self.labels_to_belongings(self.mapLabels(x_series, y_series, in_view_box, percent_impute), output)
+
+    def labels_to_belongings(self, labels, output="list"):
+        """
+        Converts labels, as returned by mapLabels, into the belongings returned by mapBelongings.
+        :param labels: An int32 array of the indices of polygons in ids_, or -1 for no polygon.
+        :param output: Form of the result, as in mapBelongings.
+        :return: The polygons names of the labels, in the form asked by output.
+        """
+        if output == "list":
+            return [self.ids_[label] if label >= 0 else None for label in labels]
+        if output == "codes":
+            return labels, list(self.ids_)
+        if output == "categorical":
+            import pandas as pd
+            # A name given to several paths is a single category, and -1 stays -1 through the last code
+            categories = list(dict.fromkeys(self.ids_))
+            positions = {name: i for i, name in enumerate(categories)}
+            codes = np.array([positions[name] for name in self.ids_] + [-1], dtype=np.int32)
+            return pd.Categorical.from_codes(codes[labels], categories=categories)
+        raise ValueError("Unknown output \'%s\'. Expected \'list\', \'codes\' or \'categorical\'." % output)
+
+    def mapLabels(self, x_series, y_series, in_view_box=False, percent_impute=None, n_jobs=None, unique=False):
+        """
+        Vectorised version of mapBelongings, working on whole arrays of coordinates at once.
+        When a raster was built by rasterize, only the points of its boundary cells are tested exactly.
+        :param x_series: Array, Series or list of x coordinates.
+        :param y_series: Array, Series or list of y coordinates.
+        :param in_view_box: Boolean that tells if the coordinates to be considered are the view_box's original ones.
+        :param percent_impute: Percent of the view port that a point should be given a belonging if it is outside of
+        all polygons.
+        :param n_jobs: If given, the points are split in chunks classified by that many processes, which share the
+        geometry and the output array through shared memory. -1 uses all the CPUs.
+        :param unique: If True, each distinct point is only classified once and its label is copied back to all its
+        occurrences, which pays off when the same coordinates are repeated a lot.
+        :return: An int32 array of the indices of the containing polygons in ids_, or -1 if there is none.
+        """
+        x, y = self.scale_array(x_series, y_series, reverse=True) if in_view_box \
+            else (np.asarray(x_series, dtype=np.float64), np.asarray(y_series, dtype=np.float64))
+        if unique:
+            x, y, inverse = unique_points(x, y)
+            return self.mapLabels(x, y, percent_impute=percent_impute, n_jobs=n_jobs)[inverse]
+        start = time.perf_counter()
+        if n_jobs is not None and n_jobs != 1:
+            labels = map_labels_parallel(self, x, y, percent_impute, n_jobs)
+            self.stats_.record("mapLabels", {"parallel": time.perf_counter() - start}, points=len(x))
+            return labels
+        tests = self._containment_tests
+        if self.raster_ is None:
+            labels = self.contain_labels(x, y)
+        else:
+            labels = self.raster_.lookup(x, y)
+            boundary = np.flatnonzero(labels == LabelRaster.BOUNDARY)
+            labels[boundary] = self.contain_labels(x[boundary], y[boundary])
+        contained = time.perf_counter()
+        outside = np.flatnonzero(labels == -1) if percent_impute is not None and percent_impute > 0 else ()
+        if len(outside):
+            labels[outside], _ = self.segment_index_.closest(x[outside], y[outside],
+                                                             self.impute_distance(percent_impute))
+        self.stats_.record("mapLabels", {"contain": contained - start, "impute": time.perf_counter() - contained},
+                           points=len(x), containment_tests=self._containment_tests - tests,
+                           imputed_points=len(outside))
+        return labels
+
+    def streamLabels(self, chunks, in_view_box=False, percent_impute=None, x_column="x", y_column="y"):
+        """
+        Streaming version of mapLabels, for inputs that don't fit in memory. Only one chunk is held at a time.
+        :param chunks: Iterable of chunks of points : tuples (x, y) of arrays, arrays of shape (n, 2), DataFrames (such
+        as the ones of read_csv(chunksize=...)) or Arrow record batches.
+        :param in_view_box: Boolean that tells if the coordinates to be considered are the view_box's original ones.
+        :param percent_impute: Percent of the view port that a point should be given a belonging if it is outside of
+        all polygons.
+        :param x_column: Name of the x column, for the chunks with named columns.
+        :param y_column: Name of the y column, for the chunks with named columns.
+        :return: Generator of the int32 arrays of labels of each chunk, as returned by mapLabels.
+        """
+        for chunk in chunks:
+            x, y = chunk_columns(chunk, x_column, y_column)
+            yield self.mapLabels(x, y, in_view_box, percent_impute)
+
+    def aggregateBelongings(self, x_series, y_series, weights=None, in_view_box=False, percent_impute=None,
+                            chunk_size=1 << 20):
+        """
+        Counts the points belonging to each polygon, and sums their weights, without keeping the label of every point.
+        The points are classified chunk by chunk, so the memory used doesn't grow with their number.
+        :param x_series: Array, Series or list of x coordinates.
+        :param y_series: Array, Series or list of y coordinates.
+        :param weights: Array, Series or list of a value of each point, summed by polygon if given.
+        :param in_view_box: Boolean that tells if the coordinates to be considered are the view_box's original ones.
+        :param percent_impute: Percent of the view port that a point should be given a belonging if it is outside of
+        all polygons.
+        :param chunk_size: Number of points classified at once.
+        :return: Dictionary of the columns of a table with one row per polygon, ready for a DataFrame : "id" (names),
+        "count" (int64 numbers of points) and, with weights, "sum" (float64 sums of the weights).
+        """
+        x, y = np.asarray(x_series, dtype=np.float64), np.asarray(y_series, dtype=np.float64)
+        weights = None if weights is None else np.asarray(weights, dtype=np.float64)
+        chunks = ((x[i:i + chunk_size], y[i:i + chunk_size]) if weights is None else
+                  (x[i:i + chunk_size], y[i:i + chunk_size], weights[i:i + chunk_size])
+                  for i in range(0, len(x), chunk_size))
+        return self.streamAggregate(chunks, in_view_box, percent_impute, weight_column=None if weights is None else 2)
+
+    def streamAggregate(self, chunks, in_view_box=False, percent_impute=None, x_column="x", y_column="y",
+                        weight_column=None):
+        """
+        Streaming version of aggregateBelongings, for inputs that don't fit in memory. Only one chunk is held at a time.
+        :param chunks: Iterable of chunks of points, as in streamLabels. With weights, the tuples are (x, y, weights)
+        and the arrays of shape (n, 3).
+        :param in_view_box: Boolean that tells if the coordinates to be considered are the view_box's original ones.
+        :param percent_impute: Percent of the view port that a point should be given a belonging if it is outside of
+        all polygons.
+        :param x_column: Name of the x column, for the chunks with named columns.
+        :param y_column: Name of the y column, for the chunks with named columns.
+        :param weight_column: Name of the column of weights, for the chunks with named columns. If None, no sum is
+        computed. For the tuples and arrays, any value other than None reads the third column.
+        :return: The same table as aggregateBelongings.
+        """
+        counts = np.zeros(len(self.ids_), dtype=np.int64)
+        sums = None if weight_column is None else np.zeros(len(self.ids_))
+        for chunk in chunks:
+            columns = chunk_columns(chunk, x_column, y_column, weight_column)
+            accumulate_labels(self.mapLabels(columns[0], columns[1], in_view_box, percent_impute), counts, sums,
+                              None if weight_column is None else columns[2])
+        table = {"id": list(self.ids_), "count": counts}
+        if sums is not None:
+            table["sum"] = sums
+        return table
+
+    def mapContainers(self, x_series, y_series, in_view_box=False, output="arrays"):
+        """
+        Gets lists of coordinates and return all the polygons containing each point, for overlapping or nested paths.
+        Unlike mapBelongings, no point is imputed.
+        :param x_series: Array, Series or list of x coordinates.
+        :param y_series: Array, Series or list of y coordinates.
+        :param in_view_box: Boolean that tells if the coordinates to be considered are the view_box's original ones.
+        :param output: Form of the result. "arrays" gives a tuple (indptr, indices, names) of a sparse point x polygon
+        matrix in CSR layout : the polygons containing the point i are the names[j] for j in
+        indices[indptr[i]:indptr[i + 1]]. "scipy" gives it as a boolean scipy.sparse.csr_matrix, and "list" gives a
+        list of the names for each point.
+        :return: The polygons containing each respective point, in the form asked by output.
+        """
+        x, y = self.scale_array(x_series, y_series, reverse=True) if in_view_box \
+            else (np.asarray(x_series, dtype=np.float64), np.asarray(y_series, dtype=np.float64))
+        start = time.perf_counter()
+        tests = self._containment_tests
+        points, rings = self.contain_pairs(x, y)
+        self.stats_.record("mapContainers", {"contain": time.perf_counter() - start}, points=len(x),
+                           containment_tests=self._containment_tests - tests)
+        indptr, indices = membership_matrix(points, self.ring_labels_[rings], len(x), len(self.ids_))
+        if output == "arrays":
+            return indptr, indices, list(self.ids_)
+        if output == "scipy":
+            from scipy.sparse import csr_matrix
+            return csr_matrix((np.ones(len(indices), dtype=bool), indices, indptr), shape=(len(x), len(self.ids_)))
+        if output == "list":
+            return [[self.ids_[j] for j in indices[indptr[i]:indptr[i + 1]]] for i in range(len(x))]
+        raise ValueError("Unknown output \'%s\'. Expected \'arrays\', \'scipy\' or \'list\'." % output)
+
+    def rasterize(self, resolution=1024):
+        """
+        Builds a raster of the labels of the paths over the geometry, so that mapLabels and findContainer answer most
+        points with a lookup instead of a containment test. Only the points of the cells crossed by a side of a
+        polygon are still tested exactly, so the labels stay the same.
+        :param resolution: Number of cells on the longest side of the raster, or tuple (columns, rows) of cells.
+        None removes the raster.
+        """
+        self.raster_ = None
+        if resolution is None or not len(self.vertices_):
+            return
+        extent = np.concatenate((self.vertices_.min(axis=0), self.vertices_.max(axis=0)))
+        if np.ndim(resolution) == 0:
+            width, height = extent[2] - extent[0], extent[3] - extent[1]
+            resolution = (resolution, max(1, round(resolution * height / (width or 1)))) if width >= height \
+                else (max(1, round(resolution * width / height)), resolution)
+        starts, ends, _ = ring_segments(self.vertices_, self.ring_offsets_, closed=True)
+        self.raster_ = LabelRaster(extent, resolution, starts, ends, self.contain_labels)
+
+    def scale(self, point, reverse=False):
+        """
+        Applies a transformation of a coordinate tuple from a box to another.
+        The normal direction of the conversion is from the view_box_ to the data_box_.
+        :param point: Tuple of coordinates (x,y)
+        :param reverse: If True, inverts the direction of the conversion.
+        :return: Coordinates of the point in the new coordinate system.
+        """
+        if self.data_box_ is None:
+            return point
+        init_box = self.view_box_ if reverse is False else self.data_box_
+        target_box = self.data_box_ if reverse is False else self.view_box_
+        if self.invert_y:
+            point = (point[0], init_box[3]-point[1])
+        if init_box == target_box:
+            return point
+        return target_box[0] + (point[0] / (init_box[2] - init_box[0]) * (target_box[2] - target_box[0])), \
+            target_box[1] + (point[1] / ((init_box[3]) - init_box[1]) * (target_box[3] - target_box[1]))
+
+    def scale_array(self, x, y, reverse=False):
+        """
+        Applies the same transformation as scale, on whole arrays of coordinates at once.
+        :param x: Array-like of x coordinates.
+        :param y: Array-like of y coordinates.
+        :param reverse: If True, inverts the direction of the conversion.
+        :return: Tuple of float64 arrays (x, y) in the new coordinate system.
+        """
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        if self.data_box_ is None:
+            return x, y
+        init_box = self.view_box_ if reverse is False else self.data_box_
+        target_box = self.data_box_ if reverse is False else self.view_box_
+        if self.invert_y:
+            y = init_box[3] - y
+        if init_box == target_box:
+            return x, y
+        return target_box[0] + (x / (init_box[2] - init_box[0]) * (target_box[2] - target_box[0])), \
+            target_box[1] + (y / ((init_box[3]) - init_box[1]) * (target_box[3] - target_box[1]))
+
+    def path_index(self, polygon_name):
+        """
+        Returns the index of a path in ids_ and in the metrics.
+        :param polygon_name: Name of the path.
+        :return: Index of the first path of that name.
+        """
+        if polygon_name not in self.path_index_:
+            raise ValueError("Polygon \'%s\' doesn\'t exist." % polygon_name)
+        return self.path_index_[polygon_name]
+
+    def get_center(self, polygon_name):
+        """
+        Returns the centroid of a path, weighted by the areas of its rings, in the data_box_ coordinate system.
+        :param polygon_name: Name of the path.
+        :return: Tuple of coordinates (x, y).
+        """
+        center = self.metrics_["centroid"][self.path_index(polygon_name)]
+        return float(center[0]), float(center[1])
+
+    def get_area(self, polygon_name):
+        """
+        Returns the total area of the rings of a path, in the data_box_ coordinate system.
+        :param polygon_name: Name of the path.
+        :return: The area.
+        """
+        return float(self.metrics_["area"][self.path_index(polygon_name)])
+
+    def get_bbox(self, polygon_name):
+        """
+        Returns the bounding box of a path, in the data_box_ coordinate system.
+        :param polygon_name: Name of the path.
+        :return: Tuple (x_start, y_start, x_end, y_end).
+        """
+        return tuple(float(c) for c in self.metrics_["bbox"][self.path_index(polygon_name)])
+
+    def get_perimeter(self, polygon_name):
+        """
+        Returns the total perimeter of the rings of a path, in the data_box_ coordinate system.
+        :param polygon_name: Name of the path.
+        :return: The perimeter.
+        """
+        return float(self.metrics_["perimeter"][self.path_index(polygon_name)])
+
+    def metrics_table(self):
+        """
+        Returns the metrics of all the paths as the columns of a table, ready for a DataFrame.
+        :return: Dictionary of the columns "id", "area", "centroid_x", "centroid_y", "x_start", "y_start", "x_end",
+        "y_end" and "perimeter".
+        """
+        table = {"id": list(self.ids_), "area": self.metrics_["area"], "centroid_x": self.metrics_["centroid"][:, 0],
+                 "centroid_y": self.metrics_["centroid"][:, 1]}
+        for i, name in enumerate(("x_start", "y_start", "x_end", "y_end")):
+            table[name] = self.metrics_["bbox"][:, i]
+        table["perimeter"] = self.metrics_["perimeter"]
+        return table
+
@@ -0,0 +1,152 @@
+import os
+import time
+import numpy as np
+import SVGShapeliser
+from SVGGeometry import check_view_box, read_view_box
+
+
+class Registry:
+    """
+    Registry of several layers of paths, each one read from its own SVG file.
+    Each layer is only read and indexed the first time it is queried, so that a registry can hold many layers and only
+    pay for the ones it uses. Several layers are queried together in a single pass over the points, against the rings
+    of all of them merged in one index, which is built the first time that combination of layers is queried.
+    """
+    def __init__(self, path_files, box=None, invert_y=True, backend=None, **options):
+        """
+        Constructor.
+        :param path_files: A list of SVG files, whose layers are named after their filenames without extension, or a
+        dictionary of the SVG files by layer name.
+        :param box: Box in which to scale the point coordinates. Form : (x_start, y_start, x_end, y_end)
+        :param invert_y: tells if the y coordinates are inverted. Specifically, pictures have a reverse y coordinate
+        ((0,0) is the upper left corner of the picture).
+        :param backend: Class building each layer, SVGShapeliser.Polygoniser by default.
+        :param options: Other parameters given to the constructor of each layer, such as cache_dir.
+        """
+        self.data_box_ = box
+        self.invert_y = invert_y
+        self.backend = SVGShapeliser.Polygoniser if backend is None else backend
+        self.options = options
+        if isinstance(path_files, str):
+            path_files = [path_files]
+        if isinstance(path_files, dict):
+            self.layers_ = dict(path_files)
+        elif isinstance(path_files, (list, tuple)):
+            self.layers_ = {}
+            for path_file in path_files:
+                name = os.path.splitext(os.path.basename(path_file))[0]
+                if name in self.layers_:
+                    raise ValueError("Two files give the same layer name \'%s\'. Use a dictionary to name them." % name)
+                self.layers_[name] = path_file
+        else:
+            raise TypeError("path_files must be a list or a dictionary of SVG files.")
+        # Only the headers of the files are read here, the paths are read when their layer is first queried
+        self.view_box_ = None
+        for path_file in self.layers_.values():
+            self.view_box_ = check_view_box(read_view_box(path_file), self.view_box_)
+        self._polygonisers = {}
+        self._merged = {}
+
+    def __repr__(self):
+        return "Registry(" + str(list(self.layers_)) + ", view_box = " + str(self.view_box_) + ", graph_box = " + \
+               str(self.data_box_) + ")"
+
+    def __contains__(self, name):
+        return name in self.layers_
+
+    def layer(self, name):
+        """
+        Returns the Polygoniser of a layer, reading its file on first use.
+        :param name: Name of the layer.
+        :return: The Polygoniser of the layer.
+        """
+        if name not in self.layers_:
+            raise ValueError("Layer \'%s\' doesn\'t exist." % name)
+        if name not in self._polygonisers:
+            self._polygonisers[name] = self.backend(self.layers_[name], self.data_box_, self.invert_y, **self.options)
+        return self._polygonisers[name]
+
+    def loaded_layers(self):
+        """
+        Returns the names of the layers already read.
+        :return: List of the layer names.
+        """
+        return list(self._polygonisers)
+
+    def _coordinates(self, names, x_series, y_series, in_view_box):
+        # The coordinates are converted and scaled once for all the layers, which share the same view box
+        if isinstance(names, str):
+            names = [names]
+        names = list(self.layers_) if names is None else list(names)
+        if in_view_box and names:
+            x, y = self.layer(names[0]).scale_array(x_series, y_series, reverse=True)
+        else:
+            x, y = np.asarray(x_series, dtype=np.float64), np.asarray(y_series, dtype=np.float64)
+        return names, x, y
+
+    def _labels(self, names, x, y, percent_impute):
+        # The labels of the points in each layer, from one containment pass over the rings of all the layers
+        layers = [self.layer(name) for name in names]
+        if len(layers) <= 1:
+            return {name: layer.mapLabels(x, y, percent_impute=percent_impute) for name, layer in zip(names, layers)}
+        key = tuple(names)
+        if key not in self._merged:
+            self._merged[key] = self.backend.merge(layers)
+        merged = self._merged[key]
+        ring_starts = np.cumsum([0] + [len(layer.ring_offsets_) - 1 for layer in layers])
+        path_starts = np.cumsum([0] + [len(layer.ids_) for layer in layers])
+        points, rings = merged.contain_pairs(x, y)
+        # Keeping, for each point and layer, the first ring of the layer containing it, as findContainer does
+        layer_of = np.searchsorted(ring_starts, rings, side="right") - 1
+        order = np.lexsort((rings, points, layer_of))
+        first = np.unique(layer_of[order] * len(x) + points[order], return_index=True)[1]
+        points, rings, layer_of = points[order][first], rings[order][first], layer_of[order][first]
+        labels = {}
+        for k, (name, layer) in enumerate(zip(names, layers)):
+            start = time.perf_counter()
+            in_layer = layer_of == k
+            labels[name] = np.full(len(x), -1, dtype=np.int32)
+            labels[name][points[in_layer]] = merged.ring_labels_[rings[in_layer]] - path_starts[k]
+            contained = time.perf_counter()
+            # The points outside of the layer are imputed with its own sides only
+            outside = np.flatnonzero(labels[name] == -1) if percent_impute is not None and percent_impute > 0 else ()
+            if len(outside):
+                labels[name][outside], _ = layer.segment_index_.closest(x[outside], y[outside],
+                                                                        layer.impute_distance(percent_impute))
+            layer.stats_.record("mapLabels", {"contain": contained - start, "impute": time.perf_counter() - contained},
+                                points=len(x), imputed_points=len(outside))
+        return labels
+
+    def mapLabels(self, x_series, y_series, layers=None, in_view_box=False, percent_impute=None):
+        """
+        Classifies points in several layers at once, as the mapLabels of each layer would. The points are tested in a
+        single pass against the rings of all the layers, and only imputed layer by layer.
+        :param x_series: Array, Series or list of x coordinates.
+        :param y_series: Array, Series or list of y coordinates.
+        :param layers: Name of a layer, or list of the names of the layers to query. All the layers by default.
+        :param in_view_box: Boolean that tells if the coordinates to be considered are the view_box's original ones.
+        :param percent_impute: Percent of the view port that a point should be given a belonging if it is outside of
+        all polygons.
+        :return: If layers is a name, the int32 array of labels of that layer. Otherwise, a dictionary of those arrays
+        by layer name.
+        """
+        names, x, y = self._coordinates(layers, x_series, y_series, in_view_box)
+        labels = self._labels(names, x, y, percent_impute)
+        return labels[layers] if isinstance(layers, str) else labels
+
+    def mapBelongings(self, x_series, y_series, layers=None, in_view_box=False, percent_impute=None, output="list"):
+        """
+        Gets lists of coordinates and return the polygon names to which they belong or None, in several layers at once.
+        :param x_series: List of x coordinates.
+        :param y_series: List of y coordinates.
+        :param layers: Name of a layer, or list of the names of the layers to query. All the layers by default.
+        :param in_view_box: Boolean that tells if the coordinates to be considered are the view_box's original ones.
+        :param percent_impute: If a value is given, the mapper will test diverse positions to find the closest polygon
+        up to the value given in percents as a distance relative to the viewport size.
+        :param output: Form of the result of each layer, as in the mapBelongings of the Polygonisers.
+        :return: If layers is a name, the belongings in that layer. Otherwise, a dictionary of them by layer name.
+        """
+        names, x, y = self._coordinates(layers, x_series, y_series, in_view_box)
+        labels = self._labels(names, x, y, percent_impute)
+        belongings = {name: self.layer(name).labels_to_belongings(labels[name], output) for name in names}
+        return belongings[layers] if isinstance(layers, str) else belongings
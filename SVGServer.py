@@ -0,0 +1,327 @@
+"""
+Local classification server : the geometry is read once, and the single points sent by all the clients are gathered
+into micro-batches classified at once by mapLabels.
+The protocol is one JSON object per line, over a localhost TCP port or a Unix socket :
+- {"x": 12.5, "y": 40} is answered by {"id": "name"} ({"id": null} outside of every polygon) ;
+- {"x": [12.5, 3], "y": [40, 7]} is a bulk request, classified on its own and answered by {"ids": ["name", null]}.
+Requests can be pipelined on a connection, their answers come back in the same order.
+Run "python SVGServer.py --help" for the options.
+"""
+import argparse
+import asyncio
+import json
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+
+class MicroBatcher:
+    """
+    MicroBatcher gathers the points classified concurrently into batches given to the mapLabels of a Polygoniser.
+    A batch is classified as soon as it holds max_batch points, or max_wait seconds after its first point arrived, so
+    that the latency of a point is bounded.
+    The classifications run one at a time in a thread of their own, so that the event loop keeps reading and batching
+    the requests meanwhile. Bulk requests are classified by slices taking about as long as a batch, between which the
+    pending batches get their turn : a point waits at most max_wait and the slice being classified, about two batches
+    long at most, before its own batch.
+    """
+    def __init__(self, polygoniser, max_batch=1024, max_wait=0.002, in_view_box=False, percent_impute=None):
+        """
+        Constructor.
+        :param polygoniser: SVGPolygoniser or SVGShapeliser Polygoniser classifying the points.
+        :param max_batch: Maximal number of points of a batch.
+        :param max_wait: Maximal time, in seconds, that the first point of a batch waits for the others.
+        :param in_view_box: Boolean that tells if the coordinates to be considered are the view_box's original ones.
+        :param percent_impute: Percent of the view port that a point should be given a belonging if it is outside of
+        all polygons.
+        """
+        self.polygoniser = polygoniser
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.in_view_box = in_view_box
+        self.percent_impute = percent_impute
+        self._x, self._y, self._futures = [], [], []
+        self._timer = None
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self.batches_ = 0
+        self.points_ = 0
+
+    def classify(self, x, y):
+        """
+        Adds a point to the current batch.
+        :param x: x coordinate.
+        :param y: y coordinate.
+        :return: Future of the name of the polygon containing the point, or None.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._x.append(x)
+        self._y.append(y)
+        self._futures.append(future)
+        if len(self._futures) >= self.max_batch:
+            self.flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self.flush)
+        return future
+
+    async def classify_many(self, x, y):
+        """
+        Classifies a bulk of points outside of the micro-batches, by slices. The first slice holds max_batch points,
+        and the next ones grow as long as they take less time than it did, so that the fixed cost of a classification
+        doesn't add up over many small slices while a slice still takes about as long as a batch.
+        :param x: Array of x coordinates.
+        :param y: Array of y coordinates.
+        :return: List of the names of the polygons containing the points, or None.
+        """
+        loop = asyncio.get_running_loop()
+        names = []
+        start, size, reference = 0, self.max_batch, None
+        while start < len(x):
+            slice_names, seconds = await loop.run_in_executor(self._executor, self._classify_timed,
+                                                              x[start:start + size], y[start:start + size])
+            names.extend(slice_names)
+            start += size
+            if reference is None:
+                reference = seconds
+            elif seconds < reference:
+                size *= 2
+            elif seconds > 2 * reference:
+                size = max(size // 2, self.max_batch)
+        return names
+
+    def flush(self):
+        """
+        Sends the points of the current batch to be classified, their futures getting the results once done.
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        x, y, futures = self._x, self._y, self._futures
+        self._x, self._y, self._futures = [], [], []
+        if not futures:
+            return
+        done = asyncio.get_running_loop().run_in_executor(self._executor, self._classify, x, y)
+        done.add_done_callback(lambda done: self._resolve(futures, done))
+
+    def close(self):
+        """
+        Stops the thread of the classifications, once the pending ones are done.
+        """
+        self._executor.shutdown(wait=False)
+
+    def _classify(self, x, y):
+        # Runs in the thread of the classifications
+        labels = self.polygoniser.mapLabels(x, y, self.in_view_box, self.percent_impute)
+        self.batches_ += 1
+        self.points_ += len(labels)
+        return self.names(labels)
+
+    def _classify_timed(self, x, y):
+        # Timed in the thread itself, without the batches that the slice waited for
+        start = time.perf_counter()
+        names = self._classify(x, y)
+        return names, time.perf_counter() - start
+
+    @staticmethod
+    def _resolve(futures, done):
+        if done.exception() is not None:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(done.exception())
+            return
+        for future, name in zip(futures, done.result()):
+            if not future.done():  # The client may have left
+                future.set_result(name)
+
+    def names(self, labels):
+        """
+        Converts labels returned by mapLabels into the names of their polygons.
+        :param labels: Array of labels.
+        :return: List of the names, or None for -1.
+        """
+        ids = self.polygoniser.ids_
+        return [ids[label] if label >= 0 else None for label in labels.tolist()]
+
+
+async def _answer(batcher, line):
+    try:
+        request = json.loads(line)
+        x, y = request["x"], request["y"]
+        if isinstance(x, list):
+            if not isinstance(y, list) or len(x) != len(y):
+                raise ValueError("x and y must have the same length.")
+            return {"ids": await batcher.classify_many(np.asarray(x, dtype=np.float64),
+                                                       np.asarray(y, dtype=np.float64))}
+        return {"id": await batcher.classify(float(x), float(y))}
+    except Exception as e:
+        return await _error(e)
+
+
+async def _error(e):
+    return {"error": "%s: %s" % (type(e).__name__, e)}
+
+
+async def _handle(batcher, reader, writer):
+    # Each request is answered by its own task, and the answers are written back in the order of the requests
+    answers = asyncio.Queue()
+
+    async def write_answers():
+        while True:
+            answer = await answers.get()
+            if answer is None:
+                break
+            writer.write(json.dumps(await answer).encode() + b"\n")
+            await writer.drain()
+
+    writing = asyncio.ensure_future(write_answers())
+    try:
+        while True:
+            try:
+                line = await reader.readline()
+            except ValueError as e:  # Request longer than the limit of the server, the connection can't go on
+                answers.put_nowait(asyncio.ensure_future(_error(e)))
+                break
+            if not line:
+                break
+            if line.strip():
+                answers.put_nowait(asyncio.ensure_future(_answer(batcher, line)))
+    finally:
+        answers.put_nowait(None)
+        try:
+            await writing
+        except ConnectionError:
+            pass
+        writer.close()
+
+
+async def serve(polygoniser, host="127.0.0.1", port=8765, path=None, max_batch=1024, max_wait=0.002,
+                in_view_box=False, percent_impute=None, limit=1 << 26):
+    """
+    Starts a classification server in the running event loop.
+    :param polygoniser: SVGPolygoniser or SVGShapeliser Polygoniser classifying the points.
+    :param host: Host of the TCP server. Keep it local : there is no authentication.
+    :param port: Port of the TCP server.
+    :param path: If given, path of a Unix socket to listen to instead of the TCP port.
+    :param max_batch: Maximal number of points of a micro-batch.
+    :param max_wait: Maximal time, in seconds, that the first point of a micro-batch waits for the others.
+    :param in_view_box: Boolean that tells if the coordinates to be considered are the view_box's original ones.
+    :param percent_impute: Percent of the view port that a point should be given a belonging if it is outside of
+    all polygons.
+    :param limit: Maximal size of a request, in bytes, which bounds the size of the bulk requests.
+    :return: The asyncio Server. Its batcher_ attribute is the MicroBatcher of the server.
+    """
+    batcher = MicroBatcher(polygoniser, max_batch, max_wait, in_view_box, percent_impute)
+
+    def handle(reader, writer):
+        return _handle(batcher, reader, writer)
+
+    server = await asyncio.start_unix_server(handle, path, limit=limit) if path is not None \
+        else await asyncio.start_server(handle, host, port, limit=limit)
+    server.batcher_ = batcher
+    return server
+
+
+class Client:
+    """
+    Blocking client of a classification server.
+    """
+    def __init__(self, host="127.0.0.1", port=8765, path=None, timeout=None):
+        """
+        Constructor. Connects to the server.
+        :param host: Host of the TCP server.
+        :param port: Port of the TCP server.
+        :param path: If given, path of the Unix socket of the server, used instead of the TCP port.
+        :param timeout: Timeout of the socket operations, in seconds.
+        """
+        if path is not None:
+            self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.socket.settimeout(timeout)
+            self.socket.connect(path)
+        else:
+            self.socket = socket.create_connection((host, port), timeout)
+        self.file = self.socket.makefile("rwb")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        self.file.close()
+        self.socket.close()
+
+    def request(self, request):
+        """
+        Sends a request and waits for its answer.
+        :param request: Dictionary of the request.
+        :return: Dictionary of the answer.
+        """
+        self.file.write(json.dumps(request).encode() + b"\n")
+        self.file.flush()
+        answer = json.loads(self.file.readline())
+        if "error" in answer:
+            raise ValueError(answer["error"])
+        return answer
+
+    def findContainer(self, point):
+        """
+        Return the name of the polygon which contains the point.
+        :param point: A tuple of of coordinates (x, y)
+        :return: The name of the polygon, or None if the point is outside every polygon.
+        """
+        return self.request({"x": float(point[0]), "y": float(point[1])})["id"]
+
+    def mapBelongings(self, x_series, y_series):
+        """
+        Gets lists of coordinates and return the polygon names to which they belong or None, in a single request.
+        :param x_series: List of x coordinates.
+        :param y_series: List of y coordinates.
+        :return: The polygons names containing each respective point.
+        """
+        return self.request({"x": np.asarray(x_series, dtype=np.float64).tolist(),
+                             "y": np.asarray(y_series, dtype=np.float64).tolist()})["ids"]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("svg", help="SVG file of the paths.")
+    parser.add_argument("--box", type=float, nargs=4, help="Box in which to scale the point coordinates.")
+    parser.add_argument("--no-invert-y", action="store_true", help="Don't invert the y coordinates.")
+    parser.add_argument("--backend", choices=("shapely", "matplotlib"), default="shapely")
+    parser.add_argument("--cache-dir", help="Folder of the geometry cache.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", help="Path of a Unix socket to listen to instead of the TCP port.")
+    parser.add_argument("--max-batch", type=int, default=1024, help="Maximal number of points of a micro-batch.")
+    parser.add_argument("--max-wait", type=float, default=0.002,
+                        help="Maximal time, in seconds, that a point waits for the others of its micro-batch.")
+    parser.add_argument("--in-view-box", action="store_true", help="The coordinates are the view box's ones.")
+    parser.add_argument("--impute", type=float, help="percent_impute of the classification.")
+    args = parser.parse_args(argv)
+
+    if args.backend == "shapely":
+        from SVGShapeliser import Polygoniser
+    else:
+        from SVGPolygoniser import Polygoniser
+    polygoniser = Polygoniser(args.svg, tuple(args.box) if args.box else None, not args.no_invert_y,
+                              cache_dir=args.cache_dir)
+
+    async def run():
+        server = await serve(polygoniser, args.host, args.port, args.unix, args.max_batch, args.max_wait,
+                             args.in_view_box, args.impute)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            server.batcher_.close()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+"""
+Benchmark of the SVGPolygoniser and SVGShapeliser backends on synthetic SVG files.
+Run "python benchmark.py --help" for the options. The results are written as JSON, so that runs made on different
+versions can be compared.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import numpy as np
+import SVGPolygoniser
+import SVGServer
+import SVGShapeliser
+
+BACKENDS = {"SVGPolygoniser": SVGPolygoniser.Polygoniser, "SVGShapeliser": SVGShapeliser.Polygoniser}
+
+
+def generate_svg(path_file, n_paths, rings_per_path, vertices_per_ring, seed=0, view_box=(0, 0, 1000, 1000)):
+    """
+    Writes a synthetic SVG file, in the layout read by the Polygonisers.
+    The paths are the cells of a square grid. Each cell is cut in rings_per_path strips, each holding one star-shaped
+    ring, so that the rings don't overlap and leave gaps for the imputation.
+    :param path_file: Filepath of the SVG file to write.
+    :param n_paths: Number of paths.
+    :param rings_per_path: Number of rings of each path.
+    :param vertices_per_ring: Number of vertices of each ring.
+    :param seed: Seed of the random shapes.
+    :param view_box: View box of the SVG file. Form : (x_start, y_start, x_end, y_end)
+    """
+    rnd = random.Random(seed)
+    side = math.ceil(math.sqrt(n_paths))
+    cell_width = (view_box[2] - view_box[0]) / side
+    cell_height = (view_box[3] - view_box[1]) / side
+    strip_height = cell_height / rings_per_path
+    with open(path_file, "w") as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+                '<svg xmlns="http://www.w3.org/2000/svg"\n   viewBox="%d %d %d %d">\n' % tuple(view_box))
+        for p in range(n_paths):
+            x_start = view_box[0] + (p % side) * cell_width
+            y_start = view_box[1] + (p // side) * cell_height
+            rings = []
+            for r in range(rings_per_path):
+                center = (x_start + cell_width / 2, y_start + (r + .5) * strip_height)
+                radius = min(cell_width, strip_height) / 2
+                rings.append("M " + " ".join("%.3f,%.3f" % (center[0] + radius * rnd.uniform(.5, .95) * math.cos(a),
+                                                            center[1] + radius * rnd.uniform(.5, .95) * math.sin(a))
+                                             for a in (2 * math.pi * v / vertices_per_ring
+                                                       for v in range(vertices_per_ring))) + " Z")
+            f.write('  <path id="path%d"\n     d="%s" />\n' % (p, " ".join(rings)))
+        f.write("</svg>\n")
+
+
+def measure(function, *args, trace_memory=True, **kwargs):
+    """
+    Calls a function, measuring its duration and the peak of the memory it allocates through Python.
+    tracemalloc slows down the call a lot, so the memory is measured by a second, separate call.
+    :param trace_memory: If False, the function is called only once, and the peak memory is None.
+    :return: Tuple (result, seconds, peak memory in bytes).
+    """
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    seconds = time.perf_counter() - start
+    peak = None
+    if trace_memory:
+        tracemalloc.start()
+        try:
+            function(*args, **kwargs)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return result, seconds, peak
+
+
+def run(path_file, backend, n_points, n_single, percent_impute, box, seed=0, trace_memory=True):
+    """
+    Benchmarks one backend on one SVG file.
+    :param path_file: Filepath of the SVG file.
+    :param backend: Name of the backend, key of BACKENDS.
+    :param n_points: Number of points given to mapBelongings.
+    :param n_single: Number of points given one by one to findContainer.
+    :param percent_impute: Value of percent_impute for the imputation runs.
+    :param box: Data box of the Polygoniser.
+    :param seed: Seed of the random points.
+    :param trace_memory: If False, the peak memory isn't measured.
+    :return: Dictionary of the measures.
+    """
+    rng = np.random.default_rng(seed)
+    # Points slightly beyond the box, so that some of them need to be imputed
+    margin_x, margin_y = (box[2] - box[0]) * .02, (box[3] - box[1]) * .02
+    x = rng.uniform(box[0] - margin_x, box[2] + margin_x, n_points)
+    y = rng.uniform(box[1] - margin_y, box[3] + margin_y, n_points)
+    results = {}
+
+    polygoniser, seconds, peak = measure(BACKENDS[backend], path_file, box, trace_memory=trace_memory)
+    results["read_files"] = {"seconds": seconds, "peak_bytes": peak}
+
+    def find_all(impute):
+        return [polygoniser.findContainer((x[i], y[i]), percent_impute=impute) for i in range(n_single)]
+
+    for name, impute in (("findContainer", None), ("findContainer_impute", percent_impute)):
+        _, seconds, peak = measure(find_all, impute, trace_memory=trace_memory)
+        results[name] = {"seconds": seconds, "points": n_single, "points_per_second": n_single / seconds,
+                         "peak_bytes": peak}
+    for name, impute in (("mapBelongings", None), ("mapBelongings_impute", percent_impute)):
+        belongings, seconds, peak = measure(polygoniser.mapBelongings, x, y, percent_impute=impute,
+                                             trace_memory=trace_memory)
+        results[name] = {"seconds": seconds, "points": n_points, "points_per_second": n_points / seconds,
+                         "peak_bytes": peak, "assigned": sum(b is not None for b in belongings)}
+    return results
+
+
+def server_latency(path_file, backend, box, n_bulk, n_single, percent_impute, max_batch=1024, max_wait=0.002, seed=0):
+    """
+    Measures the latency of single points sent to a classification server while another client sends it a bulk
+    request. A single point should wait about max_wait and the classification of one batch of max_batch points, the
+    slice of the bulk request being classified when it arrives taking at most about as long as a batch.
+    :param path_file: Filepath of the SVG file.
+    :param backend: Name of the backend, key of BACKENDS.
+    :param box: Data box of the Polygoniser.
+    :param n_bulk: Number of points of the bulk request.
+    :param n_single: Number of single points sent one by one during the bulk request.
+    :param percent_impute: percent_impute of the server.
+    :param max_batch: Maximal number of points of a micro-batch.
+    :param max_wait: Maximal time, in seconds, that the first point of a micro-batch waits for the others.
+    :param seed: Seed of the random points.
+    :return: Dictionary of the measures. "within_bound" tells if 95% of the single points were answered within
+    "bound_seconds" : max_wait, the slice of the bulk request being classified (about two batches at most) and the
+    batch of the point itself. The decoding and encoding of the bulk request itself hold the server for a moment,
+    which shows in the maximal latency.
+    """
+    rng = np.random.default_rng(seed)
+    x = rng.uniform(box[0], box[2], n_bulk)
+    y = rng.uniform(box[1], box[3], n_bulk)
+    polygoniser = BACKENDS[backend](path_file, box)
+    start = time.perf_counter()
+    polygoniser.mapLabels(x[:max_batch], y[:max_batch], percent_impute=percent_impute)
+    batch_seconds = time.perf_counter() - start
+
+    loop = asyncio.new_event_loop()
+    server = loop.run_until_complete(SVGServer.serve(polygoniser, port=0, max_batch=max_batch, max_wait=max_wait,
+                                                     percent_impute=percent_impute))
+    port = server.sockets[0].getsockname()[1]
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    bulk = {}
+
+    def send_bulk():
+        with SVGServer.Client(port=port) as client:
+            start = time.perf_counter()
+            client.mapBelongings(x, y)
+            bulk["seconds"] = time.perf_counter() - start
+
+    try:
+        sender = threading.Thread(target=send_bulk)
+        sender.start()
+        time.sleep(.1)  # Leaving time for the bulk request to be sent
+        latencies = []
+        with SVGServer.Client(port=port) as client:
+            for i in range(n_single):
+                if "seconds" in bulk:
+                    break
+                start = time.perf_counter()
+                client.findContainer((x[i], y[i]))
+                latencies.append(time.perf_counter() - start)
+        sender.join()
+    finally:
+        server.batcher_.close()
+        server.close()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        # Letting the handlers of the connections end before closing the loop
+        pending = asyncio.all_tasks(loop)
+        if pending:
+            loop.run_until_complete(asyncio.wait(pending))
+        loop.close()
+    bound = max_wait + 3 * batch_seconds
+    p95 = float(np.percentile(latencies, 95)) if latencies else None
+    return {"bulk_points": n_bulk, "bulk_seconds": bulk["seconds"], "single_points": len(latencies),
+            "mean_latency_seconds": float(np.mean(latencies)) if latencies else None, "p95_latency_seconds": p95,
+            "max_latency_seconds": max(latencies, default=None), "batch_seconds": batch_seconds,
+            "bound_seconds": bound, "within_bound": p95 is not None and p95 <= bound}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--paths", type=int, nargs="+", default=[100, 1000], help="Numbers of paths of the SVG files.")
+    parser.add_argument("--rings", type=int, default=2, help="Number of rings per path.")
+    parser.add_argument("--vertices", type=int, default=32, help="Number of vertices per ring.")
+    parser.add_argument("--points", type=int, default=100000, help="Number of points given to mapBelongings.")
+    parser.add_argument("--single-points", type=int, default=2000,
+                        help="Number of points given one by one to findContainer.")
+    parser.add_argument("--impute", type=float, default=1., help="percent_impute of the imputation runs.")
+    parser.add_argument("--backends", nargs="+", choices=sorted(BACKENDS), default=sorted(BACKENDS))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-memory", action="store_true", help="Skip the measures of the peak memory.")
+    parser.add_argument("--server-bulk", type=int, default=0,
+                        help="If given, number of points of a bulk request sent to a classification server, while "
+                             "single points measure its latency.")
+    parser.add_argument("--output", help="JSON file to write the results to. By default, they are printed.")
+    args = parser.parse_args(argv)
+
+    box = (0, 0, 100, 100)
+    report = {"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+              "environment": {"python": platform.python_version(), "platform": platform.platform(),
+                              "numpy": np.__version__, "shapely": SVGShapeliser.shapely.__version__,
+                              "matplotlib": sys.modules["matplotlib"].__version__},
+              "parameters": vars(args),
+              "runs": []}
+    with tempfile.TemporaryDirectory() as folder:
+        for n_paths in args.paths:
+            path_file = os.path.join(folder, "paths_%d.svg" % n_paths)
+            generate_svg(path_file, n_paths, args.rings, args.vertices, args.seed)
+            for backend in args.backends:
+                report["runs"].append({"backend": backend, "paths": n_paths, "rings_per_path": args.rings,
+                                       "vertices_per_ring": args.vertices, "svg_bytes": os.path.getsize(path_file),
+                                       "results": run(path_file, backend, args.points, args.single_points,
+                                                      args.impute, box, args.seed, not args.no_memory)})
+                if args.server_bulk:
+                    report["runs"][-1]["server"] = server_latency(path_file, backend, box, args.server_bulk,
+                                                                  args.single_points, args.impute, seed=args.seed)
+                print("%s, %d paths : done" % (backend, n_paths), file=sys.stderr)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()